@@ -2,13 +2,40 @@
 Analysis Planner Agent - Designs multi-step analysis approach.
 """
 
-import json
 from state import AnalyticsState, AnalysisPlan, AnalysisStep, log_state_transition
 from config import get_llm, SYSTEM_PROMPT_PLANNER
-from langchain_core.messages import HumanMessage, SystemMessage
-
-
-def analysis_planner_node(state: AnalyticsState) -> AnalyticsState:
+from langchain_core.messages import HumanMessage
+from agents.llm_utils import call_llm_json, cacheable_system_message
+
+
+# Static planner system message, built once at import. A stable prefix is
+# also what makes the response cache (and provider-side prefix caching)
+# effective, since the hash of the prompt no longer varies call-to-call.
+_EXAMPLE_JSON = """{
+  "steps": [
+    {
+      "description": "Compare revenue by region QoQ",
+      "required_tables": ["revenue_fact"],
+      "sql_template": "SELECT ...",
+      "depends_on": []
+    }
+  ],
+  "estimated_time": 30,
+  "warnings": []
+}"""
+
+_PLANNER_SYSTEM_MSG = cacheable_system_message(
+    SYSTEM_PROMPT_PLANNER
+    + "\n\nIMPORTANT:\n"
+    + "You MUST respond with VALID JSON ONLY. "
+    + "Do not include any commentary, markdown, or text outside the JSON.\n"
+    + "Example:\n"
+    + _EXAMPLE_JSON
+    + "\n"
+)
+
+
+async def analysis_planner_node(state: AnalyticsState) -> AnalyticsState:
     """Design multi-step analysis plan based on intent and available data."""
     intent = state["interpreted_intent"]
     data_sources = state["available_data_sources"]
@@ -25,28 +52,6 @@ def analysis_planner_node(state: AnalyticsState) -> AnalyticsState:
         ]
     )
 
-    system_msg = SystemMessage(
-        content=(
-            SYSTEM_PROMPT_PLANNER
-            + "\n\nIMPORTANT:\n"
-            + "You MUST respond with VALID JSON ONLY. "
-            + "Do not include any commentary, markdown, or text outside the JSON.\n"
-            + 'Example:\n'
-            + '{\n'
-            + '  "steps": [\n'
-            + '    {\n'
-            + '      "description": "Compare revenue by region QoQ",\n'
-            + '      "required_tables": ["revenue_fact"],\n'
-            + '      "sql_template": "SELECT ...",\n'
-            + '      "depends_on": []\n'
-            + '    }\n'
-            + '  ],\n'
-            + '  "estimated_time": 30,\n'
-            + '  "warnings": []\n'
-            + '}\n'
-        )
-    )
-
     user_msg = HumanMessage(
         content=(
             "ANALYSIS REQUEST:\n"
@@ -65,18 +70,7 @@ def analysis_planner_node(state: AnalyticsState) -> AnalyticsState:
     llm = get_llm()
 
     try:
-        response = llm.invoke([system_msg, user_msg])
-        response_text = response.content.strip()
-
-        # Handle ```json fenced blocks if present
-        if response_text.startswith("```"):
-            lines = response_text.splitlines()
-            lines = [ln for ln in lines if not ln.strip().startswith("```")]
-            response_text = "\n".join(lines).strip()
-
-        # print("RAW PLANNER RESPONSE:", repr(response_text))  # optional debug
-
-        plan_data = json.loads(response_text)
+        plan_data = await call_llm_json(llm, [_PLANNER_SYSTEM_MSG, user_msg])
 
         steps = []
         for i, step_data in enumerate(plan_data.get("steps", []), 1):
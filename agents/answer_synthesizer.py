@@ -7,9 +7,19 @@ import json
 import re
 from state import AnalyticsState, log_state_transition
 from config import get_llm
+from agents.llm_cache import cached_astream_text
 
+try:
+    import orjson
 
-def answer_synthesizer_node(state: AnalyticsState) -> AnalyticsState:
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, default=str)
+
+
+async def answer_synthesizer_node(state: AnalyticsState) -> AnalyticsState:
     """Synthesize a direct answer to the user's question from query results."""
 
     exec_results = state.get("execution_results")
@@ -21,24 +31,27 @@ def answer_synthesizer_node(state: AnalyticsState) -> AnalyticsState:
     question = state["question"]
     llm = get_llm()
 
-    # Collect the SQL query results (the actual answers)
-    query_results_text = ""
+    # Collect the SQL query results (the actual answers).
+    # Built as a list of chunks + single join to stay O(n) instead of the
+    # O(n^2) repeated string concatenation.
+    query_chunks = []
     if "query_results" in result_data:
         for step_key, step_result in result_data["query_results"].items():
-            query_results_text += f"\n--- {step_key} ---\n"
-            query_results_text += f"SQL: {step_result.get('sql', 'N/A')}\n"
-            query_results_text += f"Columns: {step_result.get('columns', [])}\n"
-            query_results_text += f"Rows returned: {step_result.get('row_count', 0)}\n"
-            data_str = json.dumps(step_result.get("data", [])[:30], indent=2, default=str)
-            query_results_text += f"Data:\n{data_str}\n"
+            query_chunks.append(f"\n--- {step_key} ---\n")
+            query_chunks.append(f"SQL: {step_result.get('sql', 'N/A')}\n")
+            query_chunks.append(f"Columns: {step_result.get('columns', [])}\n")
+            query_chunks.append(f"Rows returned: {step_result.get('row_count', 0)}\n")
+            # No indentation: the whitespace would only inflate prompt tokens
+            data_str = _dumps(step_result.get("data", [])[:30])
+            query_chunks.append(f"Data:\n{data_str}\n")
+    query_results_text = "".join(query_chunks)
 
     # Also include summary context from pandas analysis
-    summary_text = ""
-    for key, val in result_data.items():
-        if key == "query_results":
-            continue
-        if isinstance(val, dict) and "summary" in val:
-            summary_text += f"\nDataset '{key}' summary stats available.\n"
+    summary_text = "".join(
+        f"\nDataset '{key}' summary stats available.\n"
+        for key, val in result_data.items()
+        if key != "query_results" and isinstance(val, dict) and "summary" in val
+    )
 
     # Truncate if too long
     if len(query_results_text) > 10000:
@@ -62,8 +75,12 @@ Based on these results, provide a clear, direct answer to the user's question.
 - Use markdown formatting for readability (bold key numbers, use bullet points for lists)."""
 
     try:
-        response = llm.invoke([{"role": "user", "content": prompt}])
-        state["direct_answer"] = response.content.strip()
+        # Stream instead of blocking on the full completion; tokens start
+        # flowing at TTFT and are accumulated into the final answer.
+        answer_text = await cached_astream_text(
+            llm, [{"role": "user", "content": prompt}]
+        )
+        state["direct_answer"] = answer_text.strip()
     except Exception as e:
         state["direct_answer"] = f"Could not synthesize answer: {e}"
 
@@ -2,30 +2,12 @@
 Confidence & Guardrails Agent - Quantifies uncertainty and adds caveats.
 """
 
-import json
-import re
 from state import AnalyticsState, ConfidenceMetrics, log_state_transition
 from config import get_llm, SYSTEM_PROMPT_GUARDRAILS, CONFIDENCE_THRESHOLD, MIN_DATA_POINTS
+from agents.llm_utils import call_llm_json
 
 
-def _extract_json(text: str) -> dict:
-    """Extract JSON from LLM response, handling markdown fences."""
-    cleaned = re.sub(r"```(?:json)?\s*", "", text).strip()
-    cleaned = cleaned.rstrip("`").strip()
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        pass
-    match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
-            pass
-    return {}
-
-
-def confidence_guardrails_node(state: AnalyticsState) -> AnalyticsState:
+async def confidence_guardrails_node(state: AnalyticsState) -> AnalyticsState:
     """Assess confidence in results and add appropriate disclaimers."""
 
     results = state.get("execution_results")
@@ -49,10 +31,15 @@ def confidence_guardrails_node(state: AnalyticsState) -> AnalyticsState:
 
     caveats.append("Analysis based on data from last 24 hours")
 
-    # Call LLM for confidence assessment
-    insights_dump = json.dumps(
-        [i.model_dump() for i in insights[:2]], indent=2, default=str
-    ) if insights else "[]"
+    # Call LLM for confidence assessment. Serialize the sample insights
+    # with model_dump_json (C-accelerated in pydantic v2) instead of
+    # materializing intermediate dicts and re-walking them with json.dumps;
+    # skipping the indent also keeps the prompt smaller.
+    insights_dump = (
+        "[" + ",".join(i.model_dump_json() for i in insights[:2]) + "]"
+        if insights
+        else "[]"
+    )
 
     prompt = f"""{SYSTEM_PROMPT_GUARDRAILS}
 
@@ -69,8 +56,9 @@ Assess confidence and identify any concerns.
 Return JSON: {{"overall_confidence": 0.85, "caveats": [...], "data_quality_issues": [...], "recommendations": [...]}}"""
 
     try:
-        response = llm.invoke([{"role": "user", "content": prompt}])
-        confidence_data = _extract_json(response.content)
+        confidence_data = await call_llm_json(
+            llm, [{"role": "user", "content": prompt}]
+        )
 
         confidence_metrics = ConfidenceMetrics(
             overall_confidence=confidence_data.get("overall_confidence", 0.75),
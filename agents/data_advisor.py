@@ -2,9 +2,12 @@
 Data Advisor Agent - Validates data sources and flags quality issues.
 """
 
+import re
 from datetime import datetime
+from functools import lru_cache
+
 from state import AnalyticsState, DataSources, DataSource, log_state_transition
-from data_manager import list_datasets
+from data_manager import list_datasets, catalog_version
 
 
 # ---------------------------------------------------------------------------
@@ -47,13 +50,9 @@ AVAILABLE_DATA_SOURCES = {
 # Helper: merge built-in sources with user-registered datasets
 # ---------------------------------------------------------------------------
 
-def get_all_available_sources():
-    """
-    Build a dict of all datasets from the catalog.
-    Keys: dataset name
-    Values: table/location, columns, primary_keys, quality_score, record_count,
-            description, column_metadata
-    """
+@lru_cache(maxsize=1)
+def _sources_snapshot(version: int):
+    """Build the sources dict for a given catalog version (memoized)."""
     sources = {}
     for ds in list_datasets():
         schema = ds.get("schema", {})
@@ -69,6 +68,79 @@ def get_all_available_sources():
     return sources
 
 
+def get_all_available_sources():
+    """
+    Build a dict of all datasets from the catalog.
+    Keys: dataset name
+    Values: table/location, columns, primary_keys, quality_score, record_count,
+            description, column_metadata
+
+    Cached per catalog version, so repeated questions against an
+    unchanged catalog skip the catalog re-read and dict rebuild.
+    """
+    return _sources_snapshot(catalog_version())
+
+
+# ---------------------------------------------------------------------------
+# Relevance matching
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _build_search_index(all_sources):
+    """
+    Precompute, per dataset, a lowercase token set plus the full searchable
+    text (columns + description + sample values). Memoized per catalog
+    version via _index_snapshot, so matching is set intersection instead
+    of repeated string rebuilding.
+    """
+    index = {}
+    for name, meta in all_sources.items():
+        parts = [c.lower() for c in meta["columns"]]
+        desc = meta.get("description", "").lower()
+        if desc:
+            parts.append(desc)
+        for col_info in meta.get("column_metadata", {}).values():
+            for v in col_info.get("sample_values", []):
+                parts.append(str(v).lower())
+        searchable = " ".join(parts)
+        index[name] = (set(_TOKEN_RE.findall(searchable)), searchable)
+    return index
+
+
+@lru_cache(maxsize=1)
+def _index_snapshot(version: int):
+    """Search index for a given catalog version (memoized)."""
+    return _build_search_index(_sources_snapshot(version))
+
+
+def prefetch_sources() -> None:
+    """
+    Warm the catalog snapshot and search index for the current catalog
+    version. The scan does not depend on the interpreted intent, so the
+    interpreter runs this speculatively while its LLM call is in flight;
+    by the time data_advisor_node executes, both lookups are cache hits.
+    Best-effort: any error here will resurface in the advisor proper.
+    """
+    try:
+        _index_snapshot(catalog_version())
+    except Exception:
+        pass
+
+
+def _matches_intent(tokens, searchable, terms):
+    """True if any term appears in the dataset's token set or text."""
+    for term in terms:
+        # Fast path: single-token terms hit the precomputed set
+        if term in tokens:
+            return True
+        # Fallback substring scan for multi-word/punctuated terms
+        if not term.isalnum() and term in searchable:
+            return True
+    return False
+
+
 # ---------------------------------------------------------------------------
 # Main node
 # ---------------------------------------------------------------------------
@@ -93,28 +165,14 @@ def data_advisor_node(state: AnalyticsState) -> AnalyticsState:
 
     if not user_selected:
         # Auto-detect: match metrics/entities against column names + descriptions + sample values
-        relevant_sources = []
-        metrics_lower = [m.lower() for m in intent.metrics]
-        entities_lower = [e.lower() for e in intent.entities]
-
-        for name, meta in all_sources.items():
-            cols_lower = [c.lower() for c in meta["columns"]]
-            cols_text = " ".join(cols_lower)
-            desc_text = meta.get("description", "").lower()
-
-            # Also check sample values from column_metadata
-            sample_text = ""
-            col_meta = meta.get("column_metadata", {})
-            for col_info in col_meta.values():
-                sample_vals = col_info.get("sample_values", [])
-                sample_text += " ".join(str(v).lower() for v in sample_vals) + " "
-
-            searchable = f"{cols_text} {desc_text} {sample_text}"
+        terms = {m.lower() for m in intent.metrics} | {e.lower() for e in intent.entities}
+        search_index = _index_snapshot(catalog_version())
 
-            if any(m in searchable for m in metrics_lower) or any(
-                e in searchable for e in entities_lower
-            ):
-                relevant_sources.append(name)
+        relevant_sources = [
+            name
+            for name, (tokens, searchable) in search_index.items()
+            if _matches_intent(tokens, searchable, terms)
+        ]
 
         # If generic or nothing matched, default to all datasets
         if not relevant_sources or intent.is_generic:
@@ -123,18 +181,20 @@ def data_advisor_node(state: AnalyticsState) -> AnalyticsState:
                 "No specific datasets matched intent clearly - using all available datasets"
             )
 
-    # Build DataSources object
+    # Build DataSources object; one timestamp for the whole batch instead
+    # of a fresh datetime.now() per source
+    now_iso = datetime.now().isoformat()
     sources = []
     for source_key in relevant_sources:
         source_info = all_sources[source_key]
-        location = source_info.get("location") or source_key  # fallback to name\
+        location = source_info.get("location") or source_key  # fallback to name
         source = DataSource(
             name=source_key,
             table_name=location,
             columns=source_info.get("columns", []),
             primary_keys=source_info.get("primary_keys", []),
             quality_score=source_info.get("quality_score", 0.9),
-            last_updated=datetime.now().isoformat(),
+            last_updated=now_iso,
             record_count=source_info.get("record_count", 0),
         )
 
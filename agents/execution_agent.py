@@ -8,11 +8,17 @@ For warehouse datasets:
 - Simulates execution with mock results.
 """
 
+import os
 import re
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Any
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 try:
@@ -21,22 +27,44 @@ try:
 except ImportError:
     HAS_DUCKDB = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
 from state import (
     AnalyticsState,
     AnalysisPlan,
     ExecutionResults,
     QueryExecutionRecord,
+    append_log,
     log_state_transition,
 )
-from data_manager import list_datasets
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import HumanMessage
 from config import get_llm, SYSTEM_PROMPT_SQL
+from agents.llm_utils import cacheable_system_message
+
 
 
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
+# Strips leading/trailing markdown code fences from LLM-generated SQL.
+_SQL_FENCE_RE = re.compile(r"^```(?:sql)?\s*|\s*```$", re.MULTILINE)
+
+# Static SQL prompt, built once and marked for provider-side caching
+_SQL_SYSTEM_MSG = cacheable_system_message(SYSTEM_PROMPT_SQL)
+
+
 def build_schema_context(data_sources) -> str:
     lines = []
     for src in data_sources.sources:
@@ -49,7 +77,6 @@ def generate_sql_for_step(step, state: AnalyticsState, data_sources) -> str:
     llm = get_llm()
     schema_text = build_schema_context(data_sources)
 
-    system_msg = SystemMessage(content=SYSTEM_PROMPT_SQL)
     user_msg = HumanMessage(
         content=(
             f"QUESTION:\n{state['question']}\n\n"
@@ -58,21 +85,24 @@ def generate_sql_for_step(step, state: AnalyticsState, data_sources) -> str:
             "Return only the SQL query."
         )
     )
-    response = llm.invoke([system_msg, user_msg])
+    response = llm.invoke([_SQL_SYSTEM_MSG, user_msg])
     # Strip markdown code fences if present
-    sql = response.content.strip()
-    sql = re.sub(r"^```(?:sql)?\s*", "", sql)
-    sql = re.sub(r"\s*```$", "", sql)
+    sql = _SQL_FENCE_RE.sub("", response.content.strip())
     return sql.strip()
 
 
+def _quote_ident(name: str) -> str:
+    """Quote a logical dataset name as a safe SQL identifier."""
+    return '"' + name.replace('"', '""') + '"'
+
+
 def _is_file_backed_table(table_name: str) -> bool:
     if not table_name:
         return False
     return table_name.startswith("data/datasets/") or table_name.startswith("file://data/datasets/")
 
 
-def _load_dataframe_from_table_name(table_name: str) -> pd.DataFrame:
+def _resolve_dataset_path(table_name: str) -> Path:
     if table_name.startswith("file://"):
         path_str = table_name[len("file://"):]
     else:
@@ -81,8 +111,112 @@ def _load_dataframe_from_table_name(table_name: str) -> pd.DataFrame:
     path = Path(path_str)
     if not path.exists():
         raise FileNotFoundError(f"Dataset file not found at {path}")
+    return path
+
+
+# Parsed-dataset cache keyed by (path, mtime_ns, size): repeated runs on
+# an unchanged file skip the CSV parse entirely, and only one copy of
+# each dataset is held in memory. Bounded LRU, oldest evicted first.
+_DATASET_CACHE: "OrderedDict[tuple, Any]" = OrderedDict()
+_DATASET_CACHE_MAX = 8
+
+
+def _infer_read_kwargs(path: Path) -> Dict[str, Any]:
+    """Sniff the first rows once and pin explicit dtypes for the full read.
 
-    return pd.read_csv(path)
+    Passing dtype= lets the C parser skip per-column type inference over
+    the whole file (roughly 2x on wide CSVs). Integers are pinned to the
+    nullable Int64 dtype so missing values later in the file cannot break
+    the pinned schema; object columns that parse cleanly as datetimes are
+    routed to parse_dates instead.
+    """
+    sample = pd.read_csv(path, nrows=1000)
+    dtype_map: Dict[str, str] = {}
+    parse_dates: List[str] = []
+    for col, dtype in sample.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            dtype_map[col] = "Int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtype_map[col] = "float64"
+        elif dtype == object:
+            values = sample[col].dropna()
+            if not values.empty:
+                try:
+                    pd.to_datetime(values, errors="raise")
+                    parse_dates.append(col)
+                    continue
+                except (ValueError, TypeError):
+                    pass
+            dtype_map[col] = "object"
+    kwargs: Dict[str, Any] = {"dtype": dtype_map, "engine": "c"}
+    if parse_dates:
+        kwargs["parse_dates"] = parse_dates
+    return kwargs
+
+
+@lru_cache(maxsize=32)
+def _cached_read_kwargs(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    return _infer_read_kwargs(Path(path_str))
+
+
+def _cached_load(table_name: str):
+    """Load the raw table for a dataset, reusing the parse while the file is unchanged."""
+    path = _resolve_dataset_path(table_name)
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size)
+
+    if key in _DATASET_CACHE:
+        _DATASET_CACHE.move_to_end(key)
+        return _DATASET_CACHE[key]
+
+    if HAS_PYARROW:
+        # Multi-threaded SIMD CSV parser; much faster than pandas' reader
+        data = pacsv.read_csv(str(path))
+    else:
+        try:
+            kwargs = _cached_read_kwargs(str(path), st.st_mtime_ns)
+            data = pd.read_csv(path, **kwargs)
+        except (ValueError, TypeError):
+            # Sniffed schema did not hold for the full file; fall back to
+            # plain inference rather than failing the load.
+            data = pd.read_csv(path)
+
+    _DATASET_CACHE[key] = data
+    while len(_DATASET_CACHE) > _DATASET_CACHE_MAX:
+        _DATASET_CACHE.popitem(last=False)
+    return data
+
+
+def _load_dataframe_from_table_name(table_name: str) -> pd.DataFrame:
+    data = _cached_load(table_name)
+    if isinstance(data, pd.DataFrame):
+        return data
+    return data.to_pandas()
+
+
+def _load_table_for_duckdb(table_name: str):
+    """
+    Load a dataset for DuckDB registration. With PyArrow available this
+    returns an Arrow Table that DuckDB scans zero-copy; otherwise falls
+    back to a pandas DataFrame.
+    """
+    return _cached_load(table_name)
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to a list of row dicts.
+
+    Arrow's to_pylist converts column-at-a-time in C and yields native
+    Python scalars, unlike to_dict(orient="records") which boxes every
+    cell through a per-row Python loop. Falls back to to_dict when
+    PyArrow is unavailable or the frame has Arrow-incompatible cells.
+    """
+    if HAS_PYARROW:
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False).to_pylist()
+        except Exception:
+            pass
+    return df.to_dict(orient="records")
 
 
 def _infer_schema_roles(df: pd.DataFrame) -> Dict[str, Any]:
@@ -90,27 +224,299 @@ def _infer_schema_roles(df: pd.DataFrame) -> Dict[str, Any]:
     non_numeric_cols = [c for c in df.columns if c not in numeric_cols]
 
     dims = []
-    for c in non_numeric_cols:
-        nunique = df[c].nunique(dropna=True)
-        if 1 < nunique <= 50:
-            dims.append(c)
+    if non_numeric_cols:
+        # One vectorized dispatch for all columns instead of a Python
+        # loop calling Series.nunique per column
+        nunique = df[non_numeric_cols].nunique(dropna=True)
+        dims = [c for c in non_numeric_cols if 1 < nunique[c] <= 50]
 
     return {"metrics": numeric_cols, "dimensions": dims}
 
 
+_NUMERIC_TYPE_MARKERS = ("INT", "FLOAT", "DOUBLE", "DECIMAL", "REAL")
+
+
+def _analyze_with_duckdb(path: Path) -> Dict[str, Any]:
+    """
+    Summary analysis computed entirely inside DuckDB: SUMMARIZE gives
+    per-column min/max/avg/approx distinct in one pass over the file,
+    the sample is a LIMIT 20 scan, and the heuristic groupby runs as SQL
+    with projection pushdown. Avoids re-parsing the CSV in pandas; the
+    payload matches _analyze_dataframe (summary/sample/groupby keys).
+    """
+    csv_path = str(path).replace("'", "''")
+    rel = f"read_csv_auto('{csv_path}')"
+
+    con = duckdb.connect(":memory:")
+    try:
+        summary_df = con.execute(f"SUMMARIZE SELECT * FROM {rel}").fetchdf()
+        sample_df = con.execute(f"SELECT * FROM {rel} LIMIT 20").fetchdf()
+
+        summary_records = []
+        metric = dim = None
+        row_count = 0
+        for row in _records(summary_df):
+            col_type = str(row.get("column_type", "")).upper()
+            is_numeric = any(m in col_type for m in _NUMERIC_TYPE_MARKERS)
+            count = int(row.get("count") or 0)
+            row_count = max(row_count, count)
+            approx_unique = int(row.get("approx_unique") or 0)
+
+            summary_records.append({
+                "index": row.get("column_name"),
+                "count": count,
+                "mean": pd.to_numeric(row.get("avg"), errors="coerce"),
+                "std": pd.to_numeric(row.get("std"), errors="coerce"),
+                "min": row.get("min"),
+                "max": row.get("max"),
+                "unique": approx_unique,
+            })
+
+            if is_numeric and metric is None:
+                metric = row.get("column_name")
+            elif not is_numeric and dim is None and 1 < approx_unique <= 50:
+                dim = row.get("column_name")
+
+        result: Dict[str, Any] = {
+            "summary": summary_records,
+            "sample": _records(sample_df),
+            "row_count": row_count,
+        }
+
+        if metric and dim:
+            grouped = con.execute(
+                f"SELECT {_quote_ident(dim)} AS dim_value, "
+                f"COUNT(*) AS count, "
+                f"AVG({_quote_ident(metric)}) AS mean, "
+                f"SUM({_quote_ident(metric)}) AS sum "
+                f"FROM {rel} GROUP BY 1 ORDER BY sum DESC NULLS LAST LIMIT 20"
+            ).fetchdf()
+            grouped = grouped.rename(columns={"dim_value": dim})
+            result["groupby"] = {
+                "dimension": dim,
+                "metric": metric,
+                "data": _records(grouped),
+            }
+
+        return result
+    finally:
+        con.close()
+
+
+# Files above this size are analyzed in streaming chunks instead of one
+# full in-memory load, bounding peak memory to a single chunk.
+LARGE_CSV_BYTES = 256 * 1024 * 1024
+CSV_CHUNK_ROWS = 100_000
+
+
+def _iter_chunks(path: Path, chunksize: int = CSV_CHUNK_ROWS, usecols=None):
+    """Yield a large CSV as DataFrame chunks of `chunksize` rows."""
+    yield from pd.read_csv(path, chunksize=chunksize, usecols=usecols)
+
+
+def _analyze_csv_chunked(path: Path) -> Dict[str, Any]:
+    """
+    Streaming variant of _analyze_dataframe for large files: accumulates
+    numeric stats and the heuristic groupby chunk-by-chunk so only one
+    chunk is resident at a time. The summary carries count/mean/min/max
+    per numeric column (quantiles are skipped in streaming mode).
+    """
+    result: Dict[str, Any] = {}
+
+    metric = dim = None
+    group_counts: Dict[Any, int] = {}
+    group_sums: Dict[Any, float] = {}
+    num_acc: Dict[str, Dict[str, float]] = {}
+    n_rows = 0
+
+    # Cheap first pass on a bounded prefix: sample rows, pick dim/metric,
+    # and learn which columns the accumulators need.
+    first = pd.read_csv(path, nrows=CSV_CHUNK_ROWS)
+    sample_records = _records(first.head(20))
+    roles = _infer_schema_roles(first)
+    if roles["metrics"] and roles["dimensions"]:
+        metric = roles["metrics"][0]
+        dim = roles["dimensions"][0]
+    numeric_cols = first.select_dtypes(include="number").columns.tolist()
+
+    # Project the streaming pass down to just those columns so the parser
+    # skips everything else (parse cost scales with columns read).
+    needed = list(numeric_cols)
+    if dim and dim not in needed:
+        needed.append(dim)
+    if not needed and len(first.columns):
+        # Nothing to aggregate; still stream one column to count rows.
+        needed = [first.columns[0]]
+
+    for chunk in _iter_chunks(path, usecols=needed):
+        n_rows += len(chunk)
+
+        for col in chunk.select_dtypes(include="number").columns:
+            values = chunk[col].to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            acc = num_acc.setdefault(
+                col, {"count": 0.0, "sum": 0.0, "min": np.inf, "max": -np.inf}
+            )
+            acc["count"] += len(values)
+            acc["sum"] += float(values.sum())
+            acc["min"] = min(acc["min"], float(values.min()))
+            acc["max"] = max(acc["max"], float(values.max()))
+
+        if metric and dim and metric in chunk.columns and dim in chunk.columns:
+            # Merge all groups per chunk (no top-N cut until the end)
+            for row in _fast_groupby(chunk, dim, metric, top=None):
+                key = row[dim]
+                group_counts[key] = group_counts.get(key, 0) + row["count"]
+                group_sums[key] = group_sums.get(key, 0.0) + row["sum"]
+
+    result["summary"] = [
+        {
+            "index": col,
+            "count": acc["count"],
+            "mean": acc["sum"] / acc["count"] if acc["count"] else None,
+            "min": acc["min"],
+            "max": acc["max"],
+        }
+        for col, acc in num_acc.items()
+    ]
+    result["sample"] = sample_records or []
+    result["row_count"] = n_rows
+
+    if metric and dim and group_sums:
+        top = sorted(group_sums, key=group_sums.get, reverse=True)[:20]
+        result["groupby"] = {
+            "dimension": dim,
+            "metric": metric,
+            "data": [
+                {
+                    dim: key,
+                    "count": group_counts[key],
+                    "mean": group_sums[key] / group_counts[key],
+                    "sum": group_sums[key],
+                }
+                for key in top
+            ],
+        }
+
+    return result
+
+
+def _fast_groupby(
+    df: pd.DataFrame, dim: str, metric: str, top: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Accumarray-style groupby: factorize the dimension once, then compute
+    count/sum/mean with np.bincount over contiguous arrays. One C pass
+    per aggregate instead of pandas' SeriesGroupBy dispatch; returns the
+    top groups by sum (all groups when top is None), matching the
+    previous pandas output.
+    """
+    codes, uniques = pd.factorize(df[dim])
+    values = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype=float)
+
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes = codes[valid]
+    values = values[valid]
+
+    n_groups = len(uniques)
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    order = np.argsort(sums)[::-1]
+    if top is not None:
+        order = order[:top]
+    return [
+        {
+            dim: uniques[i],
+            "count": int(counts[i]),
+            "mean": float(means[i]),
+            "sum": float(sums[i]),
+        }
+        for i in order
+    ]
+
+
+def _analyze_dataframe_polars(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Polars implementation of the summary analysis: describe, sample, and
+    the heuristic groupby run on one Polars frame with the groupby fused
+    into a single lazy plan (multi-threaded SIMD kernels). Produces the
+    same record payloads as the pandas path.
+    """
+    pldf = pl.from_pandas(df)
+    result: Dict[str, Any] = {}
+
+    # describe() gives one row per statistic; reshape to one record per
+    # column ("index" key) to match the pandas describe().T payload.
+    desc = pldf.describe()
+    stats = desc["statistic"].to_list()
+    result["summary"] = [
+        {"index": col, **dict(zip(stats, desc[col].to_list()))}
+        for col in pldf.columns
+    ]
+
+    result["sample"] = pldf.head(20).to_dicts()
+
+    roles = _infer_schema_roles(df)
+    metrics = roles["metrics"]
+    dims = roles["dimensions"]
+
+    if metrics and dims:
+        metric = metrics[0]
+        dim = dims[0]
+        grouped = (
+            pldf.lazy()
+            .group_by(dim)
+            .agg(
+                pl.len().alias("count"),
+                pl.col(metric).mean().alias("mean"),
+                pl.col(metric).sum().alias("sum"),
+            )
+            .sort("sum", descending=True)
+            .head(20)
+            .collect()
+        )
+        result["groupby"] = {
+            "dimension": dim,
+            "metric": metric,
+            "data": grouped.to_dicts(),
+        }
+
+    return result
+
+
 def _analyze_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
     """Run a basic summary analysis on a DataFrame as fallback."""
+    if HAS_POLARS:
+        try:
+            return _analyze_dataframe_polars(df)
+        except Exception:
+            pass  # fall back to the pandas path below
+
     result: Dict[str, Any] = {}
 
     try:
-        summary = df.describe(include="all").T
-        result["summary"] = summary.reset_index().to_dict(orient="records")
+        # describe(include="all") dispatches every stat across mixed dtypes
+        # and fills NaN for the non-applicable ones; a numeric-only
+        # describe plus count/nunique on the object columns is much
+        # cheaper and yields a smaller payload.
+        num = df.select_dtypes(include="number")
+        obj = df.select_dtypes(exclude="number")
+        parts = []
+        if len(num.columns):
+            parts.append(num.describe().T)
+        if len(obj.columns):
+            parts.append(obj.agg(["count", "nunique"]).T)
+        summary = pd.concat(parts) if parts else pd.DataFrame()
+        result["summary"] = _records(summary.reset_index())
     except Exception as e:
         result["summary_error"] = f"Failed to compute summary: {e}"
 
     try:
-        sample = df.head(20)
-        result["sample"] = sample.to_dict(orient="records")
+        result["sample"] = _records(df.head(20))
     except Exception as e:
         result["sample_error"] = f"Failed to compute sample: {e}"
 
@@ -123,17 +529,10 @@ def _analyze_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
         dim = dims[0]
 
         try:
-            grouped = (
-                df.groupby(dim)[metric]
-                .agg(["count", "mean", "sum"])
-                .reset_index()
-                .sort_values("sum", ascending=False)
-                .head(20)
-            )
             result["groupby"] = {
                 "dimension": dim,
                 "metric": metric,
-                "data": grouped.to_dict(orient="records"),
+                "data": _fast_groupby(df, dim, metric),
             }
         except Exception as e:
             result["groupby_error"] = f"Failed groupby on {dim},{metric}: {e}"
@@ -141,10 +540,28 @@ def _analyze_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
     return result
 
 
+# Shared in-memory DuckDB connection, created lazily and never closed so
+# its metadata and plan caches survive across execute_queries_node calls.
+# _DUCK_VIEWS tracks which (path, mtime) each view was built from so an
+# unchanged file skips re-registration. All access goes through _DUCK_LOCK;
+# DuckDB connections are not safe for concurrent cursor use from Python.
+_DUCK_LOCK = threading.Lock()
+_DUCK = None
+_DUCK_VIEWS: Dict[str, Any] = {}
+
+
+def _get_duck_connection():
+    """Return the shared DuckDB connection (callers must hold _DUCK_LOCK)."""
+    global _DUCK
+    if _DUCK is None:
+        _DUCK = duckdb.connect(":memory:")
+    return _DUCK
+
+
 def _execute_sql_on_csvs(
     queries: List[QueryExecutionRecord],
     file_backed_sources: list,
-    log: list,
+    state: AnalyticsState,
 ) -> Dict[str, Any]:
     """
     Execute SQL queries against file-backed CSVs using DuckDB.
@@ -153,57 +570,108 @@ def _execute_sql_on_csvs(
     if not HAS_DUCKDB:
         return {}
 
-    con = duckdb.connect(":memory:")
-    registered_tables = {}
-
-    # Register each CSV as a DuckDB table
-    for source in file_backed_sources:
-        try:
-            df = _load_dataframe_from_table_name(source.table_name)
-            # Register with the logical name the LLM knows about
-            con.register(source.name, df)
-            registered_tables[source.name] = df
-            log.append(f"[execute] Registered table '{source.name}' ({df.shape[0]} rows, {df.shape[1]} cols)")
-        except Exception as e:
-            log.append(f"[execute] Failed to register '{source.name}': {e}")
+    with _DUCK_LOCK:
+        con = _get_duck_connection()
+        registered_tables = {}
+
+        # Expose each CSV as a DuckDB view over read_csv_auto: DuckDB's
+        # native multi-threaded reader scans the file directly and pushes
+        # filters and projections into the scan, with no Python-side
+        # materialization. Views persist on the shared connection and are
+        # only re-created when the underlying file changes.
+        for source in file_backed_sources:
+            try:
+                path = _resolve_dataset_path(source.table_name)
+            except Exception as e:
+                append_log(state, "execute", f"Failed to register '{source.name}': {e}")
+                continue
+
+            st = path.stat()
+            view_key = (str(path), st.st_mtime_ns)
+            if _DUCK_VIEWS.get(source.name) == view_key:
+                registered_tables[source.name] = str(path)
+                continue
+
+            try:
+                ident = _quote_ident(source.name)
+                con.execute(
+                    f"CREATE OR REPLACE VIEW {ident} AS SELECT * FROM read_csv_auto(?)",
+                    [str(path)],
+                )
+                registered_tables[source.name] = str(path)
+                _DUCK_VIEWS[source.name] = view_key
+                append_log(state, "execute", f"Registered view '{source.name}' over {path}")
+            except Exception:
+                # Odd CSVs read_csv_auto can't sniff: fall back to registering
+                # the parsed table (Arrow tables scan zero-copy)
+                try:
+                    table = _load_table_for_duckdb(source.table_name)
+                    con.register(source.name, table)
+                    registered_tables[source.name] = table
+                    _DUCK_VIEWS[source.name] = view_key
+                    append_log(state, "execute", f"Registered table '{source.name}' (materialized fallback)")
+                except Exception as e:
+                    append_log(state, "execute", f"Failed to register '{source.name}': {e}")
+
+        if not registered_tables:
+            return {}
+
+        sql_results: Dict[str, Any] = {}
 
-    if not registered_tables:
-        con.close()
-        return {}
+        for q in queries:
+            sql = q.sql
+            if not sql or sql.startswith("--"):
+                q.executed = True
+                q.success = False
+                q.error_message = "No valid SQL generated"
+                continue
 
-    sql_results: Dict[str, Any] = {}
+            try:
+                result_df = con.execute(sql).fetchdf()
+                q.executed = True
+                q.success = True
+                q.rows_returned = len(result_df)
+
+                sql_results[f"step_{q.step_number}: {q.description}"] = {
+                    "sql": sql,
+                    "data": _records(result_df.head(50)),
+                    "row_count": len(result_df),
+                    "columns": list(result_df.columns),
+                }
+                append_log(state, "execute", f"SQL step {q.step_number} returned {len(result_df)} rows")
+            except Exception as e:
+                q.executed = True
+                q.success = False
+                q.error_message = str(e)
+                append_log(state, "execute", f"SQL step {q.step_number} failed: {e}")
 
-    for q in queries:
-        sql = q.sql
-        if not sql or sql.startswith("--"):
-            q.executed = True
-            q.success = False
-            q.error_message = "No valid SQL generated"
-            continue
+    return sql_results
 
-        try:
-            result_df = con.execute(sql).fetchdf()
-            q.executed = True
-            q.success = True
-            q.rows_returned = len(result_df)
-
-            sql_results[f"step_{q.step_number}: {q.description}"] = {
-                "sql": sql,
-                "data": result_df.head(50).to_dict(orient="records"),
-                "row_count": len(result_df),
-                "columns": list(result_df.columns),
-            }
-            log.append(
-                f"[execute] SQL step {q.step_number} returned {len(result_df)} rows"
-            )
-        except Exception as e:
-            q.executed = True
-            q.success = False
-            q.error_message = str(e)
-            log.append(f"[execute] SQL step {q.step_number} failed: {e}")
 
-    con.close()
-    return sql_results
+def _analyze_source(source):
+    """
+    Run the summary analysis for one data source (thread-pool worker).
+    Returns (name, analysis_result, n_rows, error); error is None on
+    success. Each DuckDB analysis opens its own connection, so workers
+    never share connection state.
+    """
+    try:
+        path = _resolve_dataset_path(source.table_name)
+        if HAS_DUCKDB:
+            # Single DuckDB pass (SUMMARIZE + sample + SQL groupby);
+            # no second CSV parse in pandas
+            analysis_result = _analyze_with_duckdb(path)
+            n_rows = analysis_result.pop("row_count", 0)
+        elif path.stat().st_size > LARGE_CSV_BYTES:
+            analysis_result = _analyze_csv_chunked(path)
+            n_rows = analysis_result.pop("row_count", 0)
+        else:
+            df = _load_dataframe_from_table_name(source.table_name)
+            analysis_result = _analyze_dataframe(df)
+            n_rows = int(df.shape[0])
+        return source.name, analysis_result, n_rows, None
+    except Exception as e:
+        return source.name, None, 0, e
 
 
 # ---------------------------------------------------------------------------
@@ -218,18 +686,29 @@ def execution_agent_node(state: AnalyticsState) -> AnalyticsState:
         state["error_state"] = "No analysis plan available"
         return log_state_transition(state, "failed", state["error_state"])
 
-    queries: List[QueryExecutionRecord] = []
-
-    for step in plan.steps:
+    def _sql_for_step(step) -> str:
         description = step.description or "Analysis step"
         try:
-            sql = generate_sql_for_step(step, state, state["available_data_sources"])
+            return generate_sql_for_step(step, state, state["available_data_sources"])
         except Exception as e:
-            sql = step.sql_template or f"-- Pseudo query for: {description} (SQL generation failed: {e})"
+            return step.sql_template or f"-- Pseudo query for: {description} (SQL generation failed: {e})"
+
+    # Each step is an independent LLM round-trip; generate them concurrently
+    # so wall time is ~one round-trip instead of one per step. LangChain
+    # clients are thread-safe for .invoke().
+    if len(plan.steps) > 1:
+        with ThreadPoolExecutor(max_workers=len(plan.steps)) as pool:
+            sqls = list(pool.map(_sql_for_step, plan.steps))
+    else:
+        sqls = [_sql_for_step(plan.steps[0])]
 
-        record = QueryExecutionRecord(
+    queries: List[QueryExecutionRecord] = []
+    for step, sql in zip(plan.steps, sqls):
+        # model_construct skips field validation; every value here is
+        # already the declared type, so pay only attribute assignment
+        record = QueryExecutionRecord.model_construct(
             step_number=step.step_number,
-            description=description,
+            description=step.description or "Analysis step",
             sql=sql,
             executed=False,
             success=None,
@@ -264,39 +743,46 @@ def execute_queries_node(state: AnalyticsState) -> AnalyticsState:
     total_rows = 0
     execution_errors: List[str] = []
 
-    file_backed_sources = [
-        s for s in data_sources.sources if _is_file_backed_table(s.table_name)
-    ]
+    # Split sources in one pass instead of a quadratic membership re-check.
+    file_backed_sources: list = []
+    non_file_sources: list = []
+    for s in data_sources.sources:
+        if _is_file_backed_table(s.table_name):
+            file_backed_sources.append(s)
+        else:
+            non_file_sources.append(s)
 
     # 1) Execute actual SQL against CSVs via DuckDB
     if file_backed_sources and HAS_DUCKDB:
         sql_results = _execute_sql_on_csvs(
-            queries, file_backed_sources, state["execution_log"]
+            queries, file_backed_sources, state
         )
         if sql_results:
             all_results["query_results"] = sql_results
             for key, res in sql_results.items():
                 total_rows += res.get("row_count", 0)
 
-    # 2) Also run generic pandas analysis for summary context
-    for source in file_backed_sources:
-        try:
-            df = _load_dataframe_from_table_name(source.table_name)
-            analysis_result = _analyze_dataframe(df)
-            all_results[source.name] = analysis_result
-            total_rows += int(df.shape[0])
-            state["execution_log"].append(
-                f"[execute] Summary analysis for '{source.name}' with {df.shape[0]} rows"
-            )
-        except Exception as e:
-            msg = f"Failed to analyze dataset '{source.name}': {e}"
-            execution_errors.append(msg)
-            state["execution_log"].append(f"[execute] {msg}")
+    # 2) Also run generic summary analysis per source for context.
+    # Sources are independent and DuckDB/PyArrow release the GIL, so fan
+    # them out across a thread pool; results are collected in order.
+    if file_backed_sources:
+        max_workers = min(len(file_backed_sources), os.cpu_count() or 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            outcomes = list(pool.map(_analyze_source, file_backed_sources))
+
+        for name, analysis_result, n_rows, error in outcomes:
+            if error is not None:
+                msg = f"Failed to analyze dataset '{name}': {error}"
+                execution_errors.append(msg)
+                append_log(state, "execute", msg)
+            else:
+                all_results[name] = analysis_result
+                total_rows += n_rows
+                append_log(
+                    state, "execute", f"Summary analysis for '{name}' with {n_rows} rows"
+                )
 
     # 3) Non-file datasets: simulated execution
-    non_file_sources = [
-        s for s in data_sources.sources if s not in file_backed_sources
-    ]
     if non_file_sources:
         for q in queries:
             if not q.executed:
@@ -304,8 +790,10 @@ def execute_queries_node(state: AnalyticsState) -> AnalyticsState:
                 q.success = True
                 q.rows_returned = 100
         total_rows += len(non_file_sources) * 100
-        state["execution_log"].append(
-            f"[execute] Simulated execution for {len(non_file_sources)} warehouse datasets"
+        append_log(
+            state,
+            "execute",
+            f"Simulated execution for {len(non_file_sources)} warehouse datasets",
         )
 
     end_time = time.time()
@@ -3,36 +3,80 @@ Insight Generator Agent - Extracts patterns and anomalies from results.
 """
 
 import json
-import re
 from typing import List
 from state import AnalyticsState, Insight, Anomaly, log_state_transition
 from config import get_llm, SYSTEM_PROMPT_INSIGHT, ANOMALY_THRESHOLD
-
-
-def _extract_json(text: str) -> dict:
-    """Extract JSON from LLM response, handling markdown fences and preamble."""
-    # Strip markdown code fences
-    cleaned = re.sub(r"```(?:json)?\s*", "", text).strip()
-    cleaned = cleaned.rstrip("`").strip()
-
-    # Try parsing the whole thing first
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        pass
-
-    # Try to find first { ... } block
-    match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
-            pass
-
-    return {}
-
-
-def insight_generator_node(state: AnalyticsState) -> AnalyticsState:
+from agents.llm_cache import cached_ainvoke
+from agents.llm_utils import extract_json
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _dumps_results(results) -> str:
+    """Serialize the result payload for the prompt; orjson handles numpy
+    scalars natively and is several times faster than stdlib json."""
+    if HAS_ORJSON:
+        return orjson.dumps(
+            results,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+        ).decode()
+    return json.dumps(results, indent=2, default=str)
+
+
+_MAX_SAMPLE_ROWS = 5
+_MAX_GROUPBY_ROWS = 10
+_MAX_QUERY_ROWS = 10
+
+
+def _cap_rows(payload: dict, key: str, limit: int) -> dict:
+    """Return a copy of payload with payload[key] capped at `limit` rows.
+
+    When rows are dropped, a `truncated_from` sentinel records the original
+    length so the LLM knows it is seeing a prefix.
+    """
+    rows = payload.get(key)
+    if not isinstance(rows, list) or len(rows) <= limit:
+        return payload
+    capped = dict(payload)
+    capped[key] = rows[:limit]
+    capped["truncated_from"] = len(rows)
+    return capped
+
+
+def _shrink_for_llm(result_data: dict) -> dict:
+    """Structurally prune result_data before serialization.
+
+    Slicing the serialized string can cut mid-token and hand the LLM invalid
+    JSON; pruning row lists instead keeps the payload well-formed and avoids
+    serializing rows that would be thrown away anyway.
+    """
+    shrunk = {}
+    for name, payload in result_data.items():
+        if not isinstance(payload, dict):
+            shrunk[name] = payload
+            continue
+        if name == "query_results":
+            shrunk[name] = {
+                key: _cap_rows(res, "data", _MAX_QUERY_ROWS)
+                if isinstance(res, dict) else res
+                for key, res in payload.items()
+            }
+            continue
+        pruned = _cap_rows(payload, "sample", _MAX_SAMPLE_ROWS)
+        groupby = pruned.get("groupby")
+        if isinstance(groupby, dict):
+            pruned = dict(pruned)
+            pruned["groupby"] = _cap_rows(groupby, "data", _MAX_GROUPBY_ROWS)
+        shrunk[name] = pruned
+    return shrunk
+
+
+async def insight_generator_node(state: AnalyticsState) -> AnalyticsState:
     """Extract insights and detect anomalies from query results."""
 
     if not state["execution_results"] or not state["execution_results"].result_data:
@@ -42,10 +86,9 @@ def insight_generator_node(state: AnalyticsState) -> AnalyticsState:
     results = state["execution_results"].result_data
     llm = get_llm()
 
-    # Truncate large payloads to avoid token limits
-    results_summary = json.dumps(results, indent=2, default=str)
-    if len(results_summary) > 12000:
-        results_summary = results_summary[:12000] + "\n... (truncated)"
+    # Prune large row lists before serializing to keep the prompt small
+    # without slicing the JSON string mid-token.
+    results_summary = _dumps_results(_shrink_for_llm(results))
 
     prompt = f"""{SYSTEM_PROMPT_INSIGHT}
 
@@ -56,8 +99,8 @@ Analyze these results and extract key insights, anomalies, and findings.
 Format response as JSON with: insights (list), anomalies (list), business_impact."""
 
     try:
-        response = llm.invoke([{"role": "user", "content": prompt}])
-        insight_data = _extract_json(response.content)
+        response = await cached_ainvoke(llm, [{"role": "user", "content": prompt}])
+        insight_data = extract_json(response.content)
 
         # Parse insights
         insights = []
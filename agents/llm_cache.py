@@ -0,0 +1,147 @@
+"""
+LLM response cache - avoids repeat round-trips for identical prompts.
+
+Responses are keyed by a SHA-256 hash of the serialized messages, so the
+static system-prompt prefix plus an identical user payload short-circuits
+the network call entirely. The cache is in-process and bounded; entries
+are evicted oldest-first once the cap is reached.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+
+# Bounded in-process cache: prompt hash -> response message
+_CACHE: "OrderedDict[str, object]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_MAX_ENTRIES = 256
+
+# Single-flight tables, one per event loop: prompt hash -> future for the
+# in-progress call, so N concurrent identical prompts collapse into one
+# upstream request. asyncio futures are loop-bound, and this module is
+# shared across threads that each run their own loop (e.g. Streamlit
+# sessions), so a future created on one loop must never be handed to a
+# waiter on another. Weak keys let a finished loop's table be collected.
+_INFLIGHT: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _message_key(message) -> tuple:
+    """Reduce a message (BaseMessage or dict) to a hashable (role, content) pair."""
+    if isinstance(message, dict):
+        return (message.get("role", ""), message.get("content", ""))
+    return (type(message).__name__, getattr(message, "content", str(message)))
+
+
+def cache_key(messages) -> str:
+    """Deterministic hash of a message list, stable across processes."""
+    payload = json.dumps([_message_key(m) for m in messages], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def cached_ainvoke(llm, messages):
+    """
+    Invoke the LLM, returning a cached response when the exact same
+    messages were seen before. Concurrent calls with identical messages
+    coalesce into a single upstream request (single-flight); only
+    successful responses are cached.
+    """
+    key = cache_key(messages)
+    loop = asyncio.get_running_loop()
+
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+        inflight = _INFLIGHT.setdefault(loop, {})
+        fut = inflight.get(key)
+        if fut is None:
+            fut = loop.create_future()
+            inflight[key] = fut
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        return await fut
+
+    try:
+        response = await llm.ainvoke(messages)
+    except BaseException as e:
+        # BaseException, not Exception: the common failure here is
+        # CancelledError from an upstream asyncio.wait_for timeout, and
+        # missing it would leave the key stuck in the table forever with
+        # every later identical prompt coalescing onto a dead future.
+        if not fut.done():
+            fut.set_exception(e)
+            # Consume the exception here too so lone flights (no waiters)
+            # don't log "exception was never retrieved".
+            fut.exception()
+        raise
+    finally:
+        with _CACHE_LOCK:
+            inflight.pop(key, None)
+
+    with _CACHE_LOCK:
+        _CACHE[key] = response
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+    if not fut.done():
+        fut.set_result(response)
+
+    return response
+
+
+async def cached_astream_text(llm, messages, on_token=None):
+    """
+    Stream the LLM response, invoking `on_token(piece)` as chunks arrive,
+    and return the full accumulated text. Cached full responses replay
+    without a network call. Streaming keeps time-to-first-token low for
+    consumers that render progressively.
+    """
+    key = "stream:" + cache_key(messages)
+
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            text = _CACHE[key]
+            if on_token is not None:
+                on_token(text)
+            return text
+
+    parts = []
+    async for chunk in llm.astream(messages):
+        piece = getattr(chunk, "content", "") or ""
+        if piece:
+            parts.append(piece)
+            if on_token is not None:
+                on_token(piece)
+    text = "".join(parts)
+
+    with _CACHE_LOCK:
+        _CACHE[key] = text
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+
+    return text
+
+
+def invalidate(messages) -> None:
+    """Drop the cached response for these messages.
+
+    For callers that validate responses after the fact (e.g. JSON
+    parsing): evicting the bad entry lets their retry reach upstream
+    instead of replaying the same unparseable response from the cache.
+    """
+    with _CACHE_LOCK:
+        _CACHE.pop(cache_key(messages), None)
+
+
+def clear_cache() -> None:
+    """Drop all cached responses (e.g., after switching models)."""
+    with _CACHE_LOCK:
+        _CACHE.clear()
@@ -0,0 +1,104 @@
+"""
+Shared LLM invocation helpers.
+
+Centralizes the "call the LLM, parse JSON, fall back" pattern used by the
+planner and guardrails agents: one place for timeouts, retries, and
+fence-tolerant JSON parsing instead of per-agent copies.
+"""
+
+import asyncio
+import json
+import re
+
+from langchain_core.messages import SystemMessage
+
+from agents.llm_cache import cached_ainvoke, invalidate
+from config import LLM_PROVIDER
+
+try:
+    import orjson
+    _loads = orjson.loads  # C-level parse, ~2-5x faster than stdlib
+except ImportError:
+    _loads = json.loads
+
+# Compiled once at import; extract_json runs on every JSON-returning call
+_FENCE_RE = re.compile(r"```(?:json)?\s*")
+_JSON_OBJ_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+DEFAULT_LLM_TIMEOUT = 30.0  # seconds per attempt
+
+
+def cacheable_system_message(text: str) -> SystemMessage:
+    """
+    Build a SystemMessage marked for provider-side prompt caching.
+
+    Anthropic needs an explicit cache_control block to amortize prefill of
+    a repeated static prefix across calls; OpenAI applies prefix caching
+    automatically, so plain string content is used there.
+    """
+    if LLM_PROVIDER == "anthropic":
+        return SystemMessage(
+            content=[{
+                "type": "text",
+                "text": text,
+                "cache_control": {"type": "ephemeral"},
+            }]
+        )
+    return SystemMessage(content=text)
+
+
+def extract_json(text: str) -> dict:
+    """Extract JSON from LLM response, handling markdown fences and preamble."""
+    cleaned = _FENCE_RE.sub("", text).strip()
+    cleaned = cleaned.rstrip("`").strip()
+    try:
+        return _loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+    match = _JSON_OBJ_RE.search(cleaned)
+    if match:
+        try:
+            return _loads(match.group())
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+async def call_llm_json(
+    llm,
+    messages,
+    *,
+    timeout: float = DEFAULT_LLM_TIMEOUT,
+    retries: int = 1,
+    fallback=None,
+):
+    """
+    Invoke the LLM and parse its response as JSON.
+
+    Each attempt is bounded by `timeout` (a hung API call no longer blocks
+    forever) and parse failures are retried up to `retries` times. When all
+    attempts fail, `fallback` is returned if provided, otherwise the last
+    error is raised so callers can run their own degraded path.
+    """
+    last_error = None
+    for _ in range(retries + 1):
+        try:
+            response = await asyncio.wait_for(
+                cached_ainvoke(llm, messages), timeout
+            )
+        except Exception as e:  # timeout or API error - retry, then fall back
+            last_error = e
+            continue
+
+        data = extract_json(response.content)
+        if data:
+            return data
+        # cached_ainvoke stored this response before we could parse it;
+        # evict it so the retry issues a fresh request instead of
+        # replaying the identical unparseable response.
+        invalidate(messages)
+        last_error = ValueError("LLM response contained no parseable JSON")
+
+    if fallback is not None:
+        return fallback
+    raise last_error
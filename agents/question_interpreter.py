@@ -2,14 +2,51 @@
 Question Interpreter Agent - Translates user questions into structured intent.
 """
 
-import json
-from typing import Optional
+import asyncio
+import re
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from state import AnalyticsState, Intent, log_state_transition
-from config import get_llm, SYSTEM_PROMPT_INTERPRETER, AGENT_CONFIG
-from langchain_core.messages import HumanMessage, SystemMessage
-
-
-def question_interpreter_node(state: AnalyticsState) -> AnalyticsState:
+from agents.data_advisor import prefetch_sources
+from config import get_llm_for, SYSTEM_PROMPT_INTERPRETER
+from langchain_core.messages import HumanMessage
+from agents.llm_cache import cached_ainvoke
+from agents.llm_utils import DEFAULT_LLM_TIMEOUT, cacheable_system_message
+
+# Single alternation compiled once instead of a per-call phrase list
+# scanned with `in` for every phrase.
+_GENERIC_RE = re.compile(
+    r"what can you (?:do|help with)"
+    r"|how can you help"
+    r"|what are your capabilities",
+    re.IGNORECASE,
+)
+
+# Static prompt: built once, reused for every question, and marked for
+# provider-side prompt caching where the provider needs an explicit hint
+_INTERPRETER_SYSTEM_MSG = cacheable_system_message(SYSTEM_PROMPT_INTERPRETER)
+
+
+class _IntentSchema(BaseModel):
+    """Response schema enforced on the model via structured output."""
+    intent: str = "custom"
+    entities: List[str] = Field(default_factory=list)
+    metrics: List[str] = Field(default_factory=list)
+    time_window: str = "90d"
+    segments: List[str] = Field(default_factory=list)
+    confidence: float = 0.8
+
+
+def _structured_llm():
+    """LLM bound to the intent schema; the provider guarantees parseable
+    output, so no fence-stripping or JSON re-parsing is needed. Rebuilt
+    per call: the underlying client is scoped per event loop (see
+    config.get_llm_for), and binding the schema is cheap next to the
+    network round-trip."""
+    return get_llm_for("question_interpreter").with_structured_output(_IntentSchema)
+
+
+async def question_interpreter_node(state: AnalyticsState) -> AnalyticsState:
     """
     Interpret user question and extract structured intent.
 
@@ -20,71 +57,36 @@ def question_interpreter_node(state: AnalyticsState) -> AnalyticsState:
     - Required segments and time windows
     """
     question = state["question"]
+    is_generic = bool(_GENERIC_RE.search(question))
 
-    llm = get_llm()
-    _ = AGENT_CONFIG["question_interpreter"]  # kept for future tuning
-
-    # Strict JSON-only system prompt
-    system_msg = SystemMessage(
-        content=(
-            SYSTEM_PROMPT_INTERPRETER
-            + "\n\nIMPORTANT:\n"
-            + "You MUST respond with VALID JSON ONLY. "
-            + "Do not include any commentary, markdown, or text outside the JSON.\n"
-            + 'Example:\n'
-            + '{\n'
-            + '  "intent": "trend_analysis",\n'
-            + '  "entities": ["product", "region"],\n'
-            + '  "metrics": ["revenue"],\n'
-            + '  "time_window": "90d",\n'
-            + '  "segments": ["region"],\n'
-            + '  "confidence": 0.85\n'
-            + '}\n'
-        )
-    )
+    # Speculative fan-out: the data advisor's catalog scan and search
+    # index are intent-independent, so warm them in a worker thread while
+    # the interpretation LLM call is in flight. prefetch_sources swallows
+    # its own errors, so this future can be safely left unawaited.
+    asyncio.get_running_loop().run_in_executor(None, prefetch_sources)
 
-    user_msg = HumanMessage(
-        content=(
-            "USER QUESTION:\n"
-            f"{question}\n\n"
-            "Respond with a single JSON object only, no explanation."
-        )
-    )
+    user_msg = HumanMessage(content=f"USER QUESTION:\n{question}")
 
     try:
-        response = llm.invoke([system_msg, user_msg])
-        response_text = response.content.strip()
-
-        # Debug: if model accidentally wraps JSON in fences, strip them
-        if response_text.startswith("```"):
-            # remove ```json ... ``` or ``` ... ```
-            lines = response_text.splitlines()
-            lines = [ln for ln in lines if not ln.strip().startswith("```")]
-            response_text = "\n".join(lines).strip()
-
-        intent_data = json.loads(response_text)
-
-        generic_phrases = [
-            "what can you do",
-            "what can you help with",
-            "how can you help",
-            "what are your capabilities",
-    ]
-
-        q_lower = question.lower()
-        is_generic = any(p in q_lower for p in generic_phrases)
+        # Repeat questions hit the prompt cache and skip the round-trip;
+        # structured output means there is nothing to fence-strip or parse.
+        # Bounded so a hung API call degrades to the fallback intent
+        # instead of stalling the whole graph.
+        parsed: _IntentSchema = await asyncio.wait_for(
+            cached_ainvoke(_structured_llm(), [_INTERPRETER_SYSTEM_MSG, user_msg]),
+            DEFAULT_LLM_TIMEOUT,
+        )
 
         intent = Intent(
-            task_type=intent_data.get("intent", "custom"),
-            entities=intent_data.get("entities", []),
-            metrics=intent_data.get("metrics", []),
-            time_window=intent_data.get("time_window", "90d"),
-            segments=intent_data.get("segments", []),
-            confidence=float(intent_data.get("confidence", 0.8)),
+            task_type=parsed.intent or "custom",
+            entities=parsed.entities,
+            metrics=parsed.metrics,
+            time_window=parsed.time_window or "90d",
+            segments=parsed.segments,
+            confidence=float(parsed.confidence),
             is_generic=is_generic,
         )
 
-
         state["interpreted_intent"] = intent
         state = log_state_transition(
             state,
@@ -95,9 +97,6 @@ def question_interpreter_node(state: AnalyticsState) -> AnalyticsState:
 
     except Exception as e:
         # Fallback: create a very simple Intent so the rest of the graph can proceed
-        q_lower = question.lower()
-        is_generic = any(p in q_lower for p in generic_phrases)
-
         fallback_intent = Intent(
             task_type="custom",
             entities=[],
@@ -2,30 +2,44 @@
 Visualization Agent - Selects appropriate chart types and creates visualizations.
 """
 
+import asyncio
 import json
-import re
+from pydantic import BaseModel, Field
 from state import AnalyticsState, Visualization, log_state_transition
-from config import get_llm, SYSTEM_PROMPT_VISUALIZER
-
-
-def _extract_json(text: str) -> dict:
-    """Extract JSON from LLM response, handling markdown fences."""
-    cleaned = re.sub(r"```(?:json)?\s*", "", text).strip()
-    cleaned = cleaned.rstrip("`").strip()
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        pass
-    match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
-            pass
-    return {}
-
-
-def visualization_agent_node(state: AnalyticsState) -> AnalyticsState:
+from config import get_llm_for, SYSTEM_PROMPT_VISUALIZER
+from agents.llm_cache import cached_ainvoke
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, default=str)
+
+# Byte budget for the data summary embedded in each visualization prompt
+_SUMMARY_BUDGET = 8000
+
+
+class _VizSchema(BaseModel):
+    """Response schema enforced on the model via structured output."""
+    chart_type: str = "bar"
+    title: str = ""
+    dimensions: dict = Field(default_factory=dict)
+    confidence: float = 0.85
+
+
+def _structured_llm():
+    """LLM bound to the chart schema; output is guaranteed parseable, so
+    the fence-stripping and JSON re-parsing path is gone. Rebuilt per
+    call: the underlying client is scoped per event loop (see
+    config.get_llm_for), and binding the schema is cheap next to the
+    network round-trip."""
+    return get_llm_for("visualization_agent").with_structured_output(_VizSchema)
+
+
+async def visualization_agent_node(state: AnalyticsState) -> AnalyticsState:
     """Create visualization configurations based on execution results and insights."""
 
     exec_results = state.get("execution_results")
@@ -35,29 +49,64 @@ def visualization_agent_node(state: AnalyticsState) -> AnalyticsState:
 
     result_data = exec_results.result_data  # dict: dataset_name -> analysis dict
     insights = state.get("insights", [])
-    llm = get_llm()
     visualizations = []
     chart_idx = 0
 
-    # Build a compact data summary for the LLM prompt
+    # Build a compact data summary for the LLM prompt. Stop formatting as
+    # soon as the byte budget is reached instead of materializing the full
+    # string and slicing it afterwards.
     data_summary_parts = []
+    summary_size = 0
     for ds_name, ds_result in result_data.items():
         part = f"Dataset: {ds_name}\n"
         if "groupby" in ds_result:
             gb = ds_result["groupby"]
             part += f"  GroupBy: {gb['dimension']} by {gb['metric']}\n"
-            part += f"  Top rows: {json.dumps(gb['data'][:5], default=str)}\n"
+            part += f"  Top rows: {_dumps(gb['data'][:5])}\n"
         if "summary" in ds_result:
-            part += f"  Summary stats (first 5): {json.dumps(ds_result['summary'][:5], default=str)}\n"
+            part += f"  Summary stats (first 5): {_dumps(ds_result['summary'][:5])}\n"
         data_summary_parts.append(part)
+        summary_size += len(part)
+        if summary_size > _SUMMARY_BUDGET:
+            data_summary_parts.append("... (truncated)")
+            break
     data_summary = "\n".join(data_summary_parts)
-    if len(data_summary) > 8000:
-        data_summary = data_summary[:8000] + "\n... (truncated)"
 
     # If we have insights, generate per-insight charts
     if insights:
+        # Rule-based fast path: when an insight's metric maps directly to
+        # a computed groupby, the chart is unambiguous (metric by
+        # dimension), so synthesize it without an LLM round-trip. Only
+        # insights the rules can't place fall through to the LLM.
+        groupby_by_metric = {}
+        for ds_name, ds_result in result_data.items():
+            if isinstance(ds_result, dict) and "groupby" in ds_result:
+                gb = ds_result["groupby"]
+                groupby_by_metric.setdefault(
+                    str(gb.get("metric", "")).lower(), (ds_name, gb)
+                )
+
+        pending = []
         for insight in insights[:3]:
-            prompt = f"""{SYSTEM_PROMPT_VISUALIZER}
+            match = groupby_by_metric.get(str(insight.metric).lower())
+            if match:
+                ds_name, gb = match
+                viz = Visualization(
+                    chart_id=f"chart_{chart_idx}",
+                    chart_type="bar",
+                    title=f"{gb['metric']} by {gb['dimension']} ({ds_name})",
+                    data_fields={"x": gb["dimension"], "y": gb["metric"], "dataset": ds_name},
+                    description=f"Visualization for: {insight.finding}",
+                    appropriateness_score=0.80,
+                )
+                visualizations.append(viz)
+                chart_idx += 1
+            else:
+                pending.append(insight)
+
+        selected = pending
+        prompts = [
+            f"""{SYSTEM_PROMPT_VISUALIZER}
 
 INSIGHT TO VISUALIZE:
 Finding: {insight.finding}
@@ -67,19 +116,31 @@ Magnitude: {insight.magnitude}
 AVAILABLE DATA:
 {data_summary}
 
-Recommend the best chart type and configuration for this insight.
-Return JSON: {{"chart_type": "...", "title": "...", "dimensions": {{"x": "...", "y": "..."}}, "confidence": 0.85}}"""
+Recommend the best chart type and configuration for this insight."""
+            for insight in selected
+        ]
+
+        # The per-insight calls are independent round-trips; fire them
+        # concurrently so wall time is ~one call, not the sum of three.
+        responses = await asyncio.gather(
+            *(
+                cached_ainvoke(_structured_llm(), [{"role": "user", "content": p}])
+                for p in prompts
+            ),
+            return_exceptions=True,
+        )
 
+        for insight, response in zip(selected, responses):
             try:
-                response = llm.invoke([{"role": "user", "content": prompt}])
-                viz_data = _extract_json(response.content)
+                if isinstance(response, BaseException):
+                    raise response
                 viz = Visualization(
                     chart_id=f"chart_{chart_idx}",
-                    chart_type=viz_data.get("chart_type", "bar"),
-                    title=viz_data.get("title", f"Chart for: {insight.finding[:60]}"),
-                    data_fields=viz_data.get("dimensions", {}),
+                    chart_type=response.chart_type or "bar",
+                    title=response.title or f"Chart for: {insight.finding[:60]}",
+                    data_fields=response.dimensions,
                     description=f"Visualization for: {insight.finding}",
-                    appropriateness_score=viz_data.get("confidence", 0.85),
+                    appropriateness_score=response.confidence,
                 )
                 visualizations.append(viz)
                 chart_idx += 1
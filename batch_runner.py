@@ -0,0 +1,117 @@
+"""
+Batch runner for the analytics engine.
+
+Runs many questions through the graph concurrently so their LLM calls
+(planner, synthesizer, guardrails, ...) overlap in flight instead of
+paying one full pipeline latency per question. Useful for dashboard
+refreshes and eval sweeps.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from state import create_initial_state
+from graph import get_graph
+
+
+class AnalyticsBatchRunner:
+    """
+    Dispatch a batch of questions through the compiled graph with bounded
+    concurrency. Each analysis keeps its own state; the shared LLM client
+    pipelines the overlapping API calls over its connection pool.
+    """
+
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max_concurrency
+
+    async def arun(
+        self,
+        questions: List[str],
+        user_id: str = "batch",
+        selected_datasets: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        graph = get_graph()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _run_one(question: str):
+            state = create_initial_state(
+                question, user_id, selected_datasets=selected_datasets
+            )
+            async with semaphore:
+                return await graph.ainvoke(state)
+
+        return await asyncio.gather(*(_run_one(q) for q in questions))
+
+    def run(self, questions: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """Synchronous convenience wrapper around arun()."""
+        return asyncio.run(self.arun(questions, **kwargs))
+
+
+def run_batch(questions: List[str], **kwargs) -> List[Dict[str, Any]]:
+    """Run a batch of questions with default concurrency settings."""
+    return AnalyticsBatchRunner().run(questions, **kwargs)
+
+
+class RequestScheduler:
+    """
+    Dynamic batching for independently arriving questions (e.g. behind an
+    API endpoint): submissions are buffered for up to `max_wait_ms` or
+    until `batch_size` accumulate, then the whole batch is dispatched
+    concurrently. Arrivals within the window share one dispatch, and the
+    identical system-prompt prefix across them benefits provider-side
+    prefix caching.
+    """
+
+    def __init__(self, batch_size: int = 8, max_wait_ms: int = 20):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        question: str,
+        user_id: str = "api",
+        selected_datasets: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Enqueue one question and await its final state."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((question, user_id, selected_datasets, future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        graph = get_graph()
+        loop = asyncio.get_running_loop()
+
+        while not self._queue.empty():
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            # Collect arrivals until the window closes or the batch fills
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            async def _run_one(item):
+                question, user_id, selected_datasets, future = item
+                try:
+                    state = create_initial_state(
+                        question, user_id, selected_datasets=selected_datasets
+                    )
+                    result = await graph.ainvoke(state)
+                    if not future.done():
+                        future.set_result(result)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+
+            await asyncio.gather(*(_run_one(item) for item in batch))
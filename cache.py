@@ -0,0 +1,155 @@
+"""
+Semantic cache for completed analyses.
+
+Stores (question, final state) pairs and answers repeat questions - or
+close paraphrases - without re-running the multi-agent pipeline. Exact
+matches on the normalized question always work; fuzzy matches use
+sentence-transformers embeddings with a cosine-similarity threshold when
+that optional dependency is installed.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    HAS_EMBEDDINGS = True
+except ImportError:
+    HAS_EMBEDDINGS = False
+
+_EMBED_MODEL_NAME = "all-MiniLM-L6-v2"  # small, fast, good enough for dedup
+
+
+def _normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+def _scope(user_id: Optional[str], selected_datasets) -> Tuple[Any, ...]:
+    """Non-question part of the cache key.
+
+    The same question against a different dataset selection (or from a
+    different user) is a different analysis; entries only match within
+    their own scope, for fuzzy lookups as well as exact ones.
+    """
+    datasets = tuple(sorted(selected_datasets)) if selected_datasets else ()
+    return (user_id, datasets)
+
+
+class SemanticStateCache:
+    """
+    Bounded in-process cache of final analysis states keyed by question
+    plus its scope (user and dataset selection).
+
+    lookup() first tries an exact normalized-question match, then falls
+    back to embedding similarity when embeddings are available; both only
+    consider entries with the same scope.
+    """
+
+    def __init__(self, max_entries: int = 128, threshold: float = 0.92):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # Parallel lists: one entry per cached analysis
+        self._questions: List[str] = []
+        self._scopes: List[Tuple[Any, ...]] = []
+        self._states: List[Dict[str, Any]] = []
+        self._embeddings: List[Any] = []
+        self._model = None
+
+    def _embed(self, question: str):
+        """Unit-norm embedding of the question, or None without the dep."""
+        if not HAS_EMBEDDINGS:
+            return None
+        if self._model is None:
+            self._model = SentenceTransformer(_EMBED_MODEL_NAME)
+        vec = self._model.encode([question], normalize_embeddings=True)[0]
+        return vec
+
+    def lookup(
+        self,
+        question: str,
+        user_id: Optional[str] = None,
+        selected_datasets=None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached final state for the question in this scope, or None."""
+        normalized = _normalize(question)
+        scope = _scope(user_id, selected_datasets)
+
+        with self._lock:
+            for i, q in enumerate(self._questions):
+                if q == normalized and self._scopes[i] == scope:
+                    return self._states[i]
+            candidates: List[Tuple[Any, Dict[str, Any]]] = [
+                (emb, st)
+                for emb, sc, st in zip(self._embeddings, self._scopes, self._states)
+                if emb is not None and sc == scope
+            ]
+
+        if not candidates:
+            return None
+        query = self._embed(normalized)
+        if query is None:
+            return None
+
+        best_state = None
+        best_score = self.threshold
+        for emb, st in candidates:
+            score = float(np.dot(query, emb))
+            if score >= best_score:
+                best_score = score
+                best_state = st
+        return best_state
+
+    def put(
+        self,
+        question: str,
+        state: Dict[str, Any],
+        user_id: Optional[str] = None,
+        selected_datasets=None,
+    ) -> None:
+        """Store a completed analysis, evicting oldest entries at the cap."""
+        normalized = _normalize(question)
+        embedding = self._embed(normalized)
+
+        scope = _scope(user_id, selected_datasets)
+        with self._lock:
+            # Replace any existing entry for this key: a forced re-run
+            # must supersede the state it bypassed, not sit behind it
+            for i, (q, sc) in enumerate(zip(self._questions, self._scopes)):
+                if q == normalized and sc == scope:
+                    del self._questions[i]
+                    del self._scopes[i]
+                    del self._states[i]
+                    del self._embeddings[i]
+                    break
+            self._questions.append(normalized)
+            self._scopes.append(scope)
+            self._states.append(state)
+            self._embeddings.append(embedding)
+            while len(self._questions) > self.max_entries:
+                self._questions.pop(0)
+                self._scopes.pop(0)
+                self._states.pop(0)
+                self._embeddings.pop(0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._questions.clear()
+            self._scopes.clear()
+            self._states.clear()
+            self._embeddings.clear()
+
+
+# Shared instance for the process
+_state_cache: Optional[SemanticStateCache] = None
+_state_cache_lock = threading.Lock()
+
+
+def get_state_cache() -> SemanticStateCache:
+    global _state_cache
+    if _state_cache is None:
+        with _state_cache_lock:
+            if _state_cache is None:
+                _state_cache = SemanticStateCache()
+    return _state_cache
@@ -1,4 +1,8 @@
+import asyncio
 import os
+import threading
+import weakref
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -85,17 +89,12 @@ STATE_PERSISTENCE = os.getenv("STATE_PERSISTENCE", "memory")  # memory, sqlite,
 # ============================================================================
 # System Prompts
 # ============================================================================
-SYSTEM_PROMPT_INTERPRETER = """You are an expert data analyst interpreter. Your job is to understand 
-user questions about business data and translate them into structured analysis requirements.
-
-When analyzing a question:
-1. Extract the main intent (trend analysis, root cause analysis, comparison, forecast, etc.)
-2. Identify key business entities (products, regions, customers, time periods)
-3. List the metrics involved (revenue, cost, customers, conversion rate, etc.)
-4. Determine required time windows and segments
-5. Assess complexity and required data sources
-
-Format your response as JSON with keys: intent, entities, metrics, time_window, segments, complexity."""
+# Schema-first and terse on purpose: prefill cost is linear in prompt
+# length and this prompt is paid on every question.
+SYSTEM_PROMPT_INTERPRETER = """Extract the analysis intent from a business data question.
+Return JSON only, no prose or markdown:
+{"intent": str, "entities": [str], "metrics": [str], "time_window": str, "segments": [str], "confidence": float}
+intent is one of: trend_analysis, root_cause, comparison, forecast, anomaly_detection, custom."""
 
 SYSTEM_PROMPT_PLANNER = """You are a master data analyst. Your job is to design efficient, multi-step 
 analysis plans that answer user questions.
@@ -182,7 +181,7 @@ data_quality_issues: [...], recommendations: [...]}"""
 AGENT_CONFIG = {
     "question_interpreter": {
         "temperature": 0.3,  # More deterministic
-        "max_tokens": 1500,
+        "max_tokens": 300,  # intent JSON is tiny; don't pay for unused budget
     },
     "data_advisor": {
         "temperature": 0.2,
@@ -202,7 +201,7 @@ AGENT_CONFIG = {
     },
     "visualization_agent": {
         "temperature": 0.3,
-        "max_tokens": 1500,
+        "max_tokens": 400,  # one small chart-config JSON per call
     },
     "confidence_guardrails": {
         "temperature": 0.2,
@@ -240,23 +239,118 @@ def validate_config():
     if LLM_PROVIDER == "anthropic" and not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY required when LLM_PROVIDER=anthropic")
 
-def get_llm():
-    """Factory function to get configured LLM."""
+def _http_limits():
+    import httpx
+    return httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+
+@lru_cache(maxsize=1)
+def _sync_http_client():
+    """
+    HTTP/2 client for LLM traffic: one multiplexed connection carries many
+    concurrent streams, so batched agent calls aren't serialized behind
+    HTTP/1.1 per-connection limits. Returns None (provider default client)
+    when httpx or the h2 extra is unavailable. Sync clients are not bound
+    to an event loop, so one process-wide pool is safe.
+    """
+    try:
+        import httpx
+        return httpx.Client(http2=True, limits=_http_limits(), timeout=30.0)
+    except Exception:
+        return None
+
+
+# LLM instances and their async HTTP client, one table per event loop.
+# httpx.AsyncClient binds keepalive connections to the loop they were
+# opened on, and every run_analysis call drives a fresh loop through
+# asyncio.run — reusing an instance across loops raises "Event loop is
+# closed" on the pooled connections (the same multi-loop reality the
+# per-loop single-flight table in agents.llm_cache handles). Weak keys
+# let a finished loop's clients be collected.
+_CLIENTS_BY_LOOP: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_CLIENTS_NO_LOOP: dict = {}  # sync-only contexts: warmup thread, scripts
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _client_table() -> dict:
+    """Client table for the running event loop (or the no-loop table)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _CLIENTS_NO_LOOP
+    with _CLIENTS_LOCK:
+        return _CLIENTS_BY_LOOP.setdefault(loop, {})
+
+
+def _async_http_client():
+    """Pooled HTTP/2 async client for the current event loop, or None."""
+    table = _client_table()
+    if "_http_async" not in table:
+        try:
+            import httpx
+            table["_http_async"] = httpx.AsyncClient(
+                http2=True, limits=_http_limits(), timeout=30.0
+            )
+        except Exception:
+            table["_http_async"] = None
+    return table["_http_async"]
+
+
+def _build_llm(temperature: float, max_tokens: int):
     if LLM_PROVIDER == "openai":
         from langchain_openai import ChatOpenAI
         return ChatOpenAI(
             model=LLM_MODEL,
-            temperature=LLM_TEMPERATURE,
-            max_tokens=LLM_MAX_TOKENS,
+            temperature=temperature,
+            max_tokens=max_tokens,
             api_key=OPENAI_API_KEY,
+            http_client=_sync_http_client(),
+            http_async_client=_async_http_client(),
         )
     elif LLM_PROVIDER == "anthropic":
         from langchain_anthropic import ChatAnthropic
+        # ChatAnthropic does not accept httpx client overrides, so the
+        # HTTP/2 pooling above is OpenAI-only; Anthropic traffic uses the
+        # provider's default (HTTP/1.1, per-instance) connection pool.
         return ChatAnthropic(
             model=LLM_MODEL,
-            temperature=LLM_TEMPERATURE,
-            max_tokens=LLM_MAX_TOKENS,
+            temperature=temperature,
+            max_tokens=max_tokens,
             api_key=ANTHROPIC_API_KEY,
         )
     else:
         raise ValueError(f"Unknown LLM_PROVIDER: {LLM_PROVIDER}")
+
+
+def get_llm():
+    """
+    Factory function to get configured LLM.
+
+    One instance per event loop: agent nodes on the same loop share the
+    client and its HTTP pools, while each fresh asyncio.run loop gets
+    clients bound to it (see _CLIENTS_BY_LOOP).
+    """
+    table = _client_table()
+    llm = table.get("__shared__")
+    if llm is None:
+        llm = table["__shared__"] = _build_llm(LLM_TEMPERATURE, LLM_MAX_TOKENS)
+    return llm
+
+
+def get_llm_for(agent: str):
+    """
+    LLM client with the per-agent temperature/max_tokens overrides from
+    AGENT_CONFIG. Tight max_tokens budgets matter: decode time and cost
+    are linear in output tokens, and e.g. the intent JSON never needs the
+    global 2000-token budget. Unknown agents fall back to the shared
+    client. Scoped per event loop like get_llm; within a loop the
+    per-agent instances share the same HTTP pools.
+    """
+    cfg = AGENT_CONFIG.get(agent)
+    if not cfg:
+        return get_llm()
+    table = _client_table()
+    llm = table.get(agent)
+    if llm is None:
+        llm = table[agent] = _build_llm(cfg["temperature"], cfg["max_tokens"])
+    return llm
@@ -3,29 +3,74 @@ import json
 from pathlib import Path
 from typing import List, Dict, Any
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Base paths
 DATA_DIR = Path(__file__).parent / "data"
 DATASETS_DIR = DATA_DIR / "datasets"
 CATALOG_PATH = DATA_DIR / "catalog.json"
 
-DATA_DIR.mkdir(exist_ok=True)
-DATASETS_DIR.mkdir(exist_ok=True)
+_dirs_ready = False
+
+
+def _ensure_dirs() -> None:
+    """Create the data directories on first use rather than at import."""
+    global _dirs_ready
+    if not _dirs_ready:
+        DATA_DIR.mkdir(exist_ok=True)
+        DATASETS_DIR.mkdir(exist_ok=True)
+        _dirs_ready = True
+
+
+# Parsed catalog cached against the file's mtime; read-heavy callers
+# (list_datasets on every request) skip the disk read and JSON parse.
+_catalog_cache: Dict[str, Any] = {"mtime": None, "data": None}
 
 
 def load_catalog() -> Dict[str, Any]:
     """Load catalog.json if it exists, else return empty catalog."""
-    if not CATALOG_PATH.exists():
+    try:
+        mtime = CATALOG_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
         return {"datasets": []}
-    with open(CATALOG_PATH, "r") as f:
-        return json.load(f)
+
+    if _catalog_cache["mtime"] == mtime:
+        return _catalog_cache["data"]
+
+    with open(CATALOG_PATH, "rb") as f:
+        data = _loads(f.read())
+    _catalog_cache["mtime"] = mtime
+    _catalog_cache["data"] = data
+    return data
 
 
 def save_catalog(catalog: Dict[str, Any]) -> None:
-    """Persist catalog.json atomically."""
+    """Persist catalog.json atomically and durably."""
+    _ensure_dirs()
     tmp_path = CATALOG_PATH.with_suffix(".tmp")
     with open(tmp_path, "w") as f:
         json.dump(catalog, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
     os.replace(tmp_path, CATALOG_PATH)
+    # Seed the cache so the next read skips the re-parse
+    _catalog_cache["mtime"] = CATALOG_PATH.stat().st_mtime_ns
+    _catalog_cache["data"] = catalog
+
+
+def catalog_version() -> int:
+    """
+    Version key for the catalog, used to invalidate caches built on top
+    of it. Backed by the file's mtime so any save bumps the version.
+    """
+    try:
+        return CATALOG_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
 
 
 def list_datasets() -> List[Dict[str, Any]]:
@@ -13,9 +13,13 @@ This file wires together:
 - confidence_guardrails
 """
 
+import threading
 from typing import TypedDict, Optional, Any
 
 from langgraph.graph import StateGraph, START, END
+from langchain_core.messages import HumanMessage
+
+from config import get_llm
 
 from state import AnalyticsState
 from agents import (
@@ -127,13 +131,37 @@ def create_graph():
 
 # Cached graph instance for reuse
 _graph_instance: Optional[Any] = None
+_graph_lock = threading.Lock()
 
 
 def get_graph():
     """
-    Get a singleton instance of the compiled graph.
+    Get a singleton instance of the compiled graph (thread-safe).
     """
     global _graph_instance
     if _graph_instance is None:
-        _graph_instance = create_graph()
+        with _graph_lock:
+            if _graph_instance is None:
+                _graph_instance = create_graph()
     return _graph_instance
+
+
+def warmup(ping_llm: bool = False) -> None:
+    """
+    Pay cold-start costs ahead of the first request: compile the graph and
+    construct the LLM client (langchain imports, HTTP pool). With
+    ping_llm=True, also issue a one-token completion so the first real
+    call reuses an already-open connection.
+
+    Best-effort throughout: a missing API key (or any other construction
+    failure) must not crash startup — the UI and CLI still work without
+    an LLM until an analysis is run, and validate_config reports the
+    configuration problem with a friendly message at that point.
+    """
+    try:
+        get_graph()
+        llm = get_llm()
+        if ping_llm:
+            llm.invoke([HumanMessage(content="ok")], max_tokens=1)
+    except Exception:
+        pass  # warmup is best-effort; never block startup on it
@@ -5,13 +5,24 @@ LangGraph-based Multi-Agent System for Intelligent Data Analysis
 """
 
 import sys
-import json
+import asyncio
+import hashlib
 import logging
+from pathlib import Path
 from typing import Optional
 from colorama import Fore, Style, init
-from state import create_initial_state, state_to_dict
+from state import create_initial_state, format_log_entry, state_to_json_bytes
 from config import validate_config, VERBOSE_LOGGING, LOG_LEVEL, LOG_FORMAT
-from graph import get_graph
+from graph import get_graph, warmup
+from cache import get_state_cache
+
+try:
+    # Drop-in libuv event loop: noticeably faster I/O scheduling for the
+    # async LLM calls. Optional; stdlib asyncio is used when absent.
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
 
 # Initialize colorama for pretty terminal output
 init(autoreset=True)
@@ -53,16 +64,36 @@ def print_status(agent: str, status: str, color: str = Fore.CYAN):
 
 def format_results(state) -> str:
     """Format final results for display."""
+    # Resolve color codes once; when stdout is piped the codes collapse to
+    # empty strings so no ANSI bytes are built or written at all.
+    use_color = sys.stdout.isatty()
+    GREEN = Fore.GREEN if use_color else ""
+    YELLOW = Fore.YELLOW if use_color else ""
+    CYAN = Fore.CYAN if use_color else ""
+    RED = Fore.RED if use_color else ""
+    WHITE = Fore.WHITE if use_color else ""
+    RESET = Style.RESET_ALL if use_color else ""
+
+    # One pass over the state up front; each section below reads a local
+    intent = state.get("interpreted_intent")
+    sources = state.get("available_data_sources")
+    plan = state.get("analysis_plan")
+    results = state.get("execution_results")
+    insights = state.get("insights")
+    anomalies = state.get("anomalies")
+    visualizations = state.get("visualizations")
+    conf = state.get("confidence_assessment")
+    execution_log = state.get("execution_log")
+
     output = []
 
     # Header
-    output.append(f"\n{Fore.GREEN}{'=' * 70}")
-    output.append(f"ANALYSIS COMPLETE{Style.RESET_ALL}\n")
+    output.append(f"\n{GREEN}{'=' * 70}")
+    output.append(f"ANALYSIS COMPLETE{RESET}\n")
 
     # Intent
-    if state.get("interpreted_intent"):
-        intent = state["interpreted_intent"]
-        output.append(f"{Fore.YELLOW}📊 INTERPRETED INTENT:{Style.RESET_ALL}")
+    if intent:
+        output.append(f"{YELLOW}📊 INTERPRETED INTENT:{RESET}")
         output.append(f"  • Task Type: {intent.task_type}")
         output.append(f"  • Metrics: {', '.join(intent.metrics)}")
         output.append(f"  • Entities: {', '.join(intent.entities)}")
@@ -70,9 +101,8 @@ def format_results(state) -> str:
         output.append("")
 
     # Data Sources
-    if state.get("available_data_sources"):
-        sources = state["available_data_sources"]
-        output.append(f"{Fore.YELLOW}🗄️  DATA SOURCES:{Style.RESET_ALL}")
+    if sources:
+        output.append(f"{YELLOW}🗄️  DATA SOURCES:{RESET}")
         output.append(f"  • Found {sources.total_sources} relevant sources")
         for source in sources.sources:
             output.append(
@@ -81,9 +111,8 @@ def format_results(state) -> str:
         output.append("")
 
     # Plan
-    if state.get("analysis_plan"):
-        plan = state["analysis_plan"]
-        output.append(f"{Fore.YELLOW}📋 ANALYSIS PLAN:{Style.RESET_ALL}")
+    if plan:
+        output.append(f"{YELLOW}📋 ANALYSIS PLAN:{RESET}")
         output.append(f"  • Steps: {plan.total_steps}")
         output.append(f"  • Est. Runtime: {plan.estimated_runtime_seconds}s")
         if plan.warnings:
@@ -93,52 +122,47 @@ def format_results(state) -> str:
         output.append("")
 
     # Execution
-    if state.get("execution_results"):
-        results = state["execution_results"]
-        output.append(f"{Fore.YELLOW}⚙️  EXECUTION RESULTS:{Style.RESET_ALL}")
+    if results:
+        output.append(f"{YELLOW}⚙️  EXECUTION RESULTS:{RESET}")
         output.append(f"  • Queries: {len(results.queries_executed)}")
         output.append(f"  • Rows: {results.row_count}")
         output.append(f"  • Time: {results.execution_time_total_ms}ms")
         output.append("")
 
     # Insights
-    if state.get("insights"):
-        insights = state["insights"]
-        output.append(f"{Fore.YELLOW}💡 INSIGHTS ({len(insights)}):{Style.RESET_ALL}")
-        for insight in insights[:5]:
-            output.append(f"  • {insight.finding}")
-            output.append(
-                f"    Metric: {insight.metric} | Magnitude: {insight.magnitude} | Confidence: {insight.confidence:.0%}"
-            )
+    if insights:
+        output.append(f"{YELLOW}💡 INSIGHTS ({len(insights)}):{RESET}")
+        output.extend(
+            f"  • {i.finding}\n"
+            f"    Metric: {i.metric} | Magnitude: {i.magnitude} | Confidence: {i.confidence:.0%}"
+            for i in insights[:5]
+        )
         output.append("")
 
     # Anomalies
-    if state.get("anomalies"):
-        anomalies = state["anomalies"]
-        output.append(f"{Fore.CYAN}⚠️  ANOMALIES ({len(anomalies)}):{Style.RESET_ALL}")
+    if anomalies:
+        output.append(f"{CYAN}⚠️  ANOMALIES ({len(anomalies)}):{RESET}")
         for anomaly in anomalies:
             severity_color = {
-                "high": Fore.RED,
-                "medium": Fore.YELLOW,
-                "low": Fore.GREEN,
-            }.get(anomaly.severity, Fore.WHITE)
+                "high": RED,
+                "medium": YELLOW,
+                "low": GREEN,
+            }.get(anomaly.severity, WHITE)
             output.append(
-                f"{severity_color}  • [{anomaly.severity.upper()}] {anomaly.description}{Style.RESET_ALL}"
+                f"{severity_color}  • [{anomaly.severity.upper()}] {anomaly.description}{RESET}"
             )
         output.append("")
 
     # Visualizations
-    if state.get("visualizations"):
-        visualizations = state["visualizations"]
-        output.append(f"{Fore.YELLOW}📈 VISUALIZATIONS ({len(visualizations)}):{Style.RESET_ALL}")
+    if visualizations:
+        output.append(f"{YELLOW}📈 VISUALIZATIONS ({len(visualizations)}):{RESET}")
         for viz in visualizations:
             output.append(f"  • {viz.title} ({viz.chart_type})")
         output.append("")
 
     # Confidence
-    if state.get("confidence_assessment"):
-        conf = state["confidence_assessment"]
-        output.append(f"{Fore.YELLOW}🎯 CONFIDENCE ASSESSMENT:{Style.RESET_ALL}")
+    if conf:
+        output.append(f"{YELLOW}🎯 CONFIDENCE ASSESSMENT:{RESET}")
         output.append(f"  • Overall Confidence: {conf.overall_confidence:.0%}")
         if conf.caveats:
             output.append(f"  • Caveats: {len(conf.caveats)}")
@@ -147,17 +171,20 @@ def format_results(state) -> str:
         output.append("")
 
     # Execution log
-    if state.get("execution_log"):
-        output.append(f"{Fore.CYAN}📝 EXECUTION LOG:{Style.RESET_ALL}")
-        for log_entry in state["execution_log"][-10:]:
-            output.append(f"  {log_entry}")
+    if execution_log:
+        output.append(f"{CYAN}📝 EXECUTION LOG:{RESET}")
+        for log_entry in execution_log[-10:]:
+            output.append(f"  {format_log_entry(log_entry)}")
 
     return "\n".join(output)
 
 
-def run_analysis(question: str, user_id: str = "user", stream: bool = False, selected_datasets=None):
+async def arun_analysis(question: str, user_id: str = "user", stream: bool = False, selected_datasets=None):
     """
-    Run the analytics engine on a question.
+    Run the analytics engine on a question (async API).
+
+    Use this from an existing event loop (batch runner, API server);
+    run_analysis wraps it for synchronous callers.
 
     Args:
         question: User's analytical question
@@ -171,6 +198,20 @@ def run_analysis(question: str, user_id: str = "user", stream: bool = False, sel
     print_banner()
     print_section("INITIALIZING ANALYSIS")
 
+    # Semantic cache: repeat questions (or close paraphrases, when the
+    # embedding dependency is installed) skip the whole pipeline. Prefix
+    # a question with !skip-cache to force a fresh run.
+    skip_cache = question.startswith("!skip-cache")
+    if skip_cache:
+        question = question[len("!skip-cache"):].strip()
+    cache = get_state_cache()
+    if not skip_cache:
+        cached_state = cache.lookup(question, user_id, selected_datasets)
+        if cached_state is not None:
+            print_status("Cache", "✓ Returning cached analysis for this question")
+            print(format_results(cached_state))
+            return cached_state
+
     # Validate configuration
     try:
         validate_config()
@@ -193,9 +234,22 @@ def run_analysis(question: str, user_id: str = "user", stream: bool = False, sel
 
     print_section("EXECUTING ANALYSIS WORKFLOW")
 
-    # Run to completion without streaming (simpler, avoids tuple issues)
+    # Stream per-node updates instead of waiting for the whole pipeline:
+    # progress appears at first-node latency, and partial results (e.g.
+    # the interpreted intent) surface as soon as their node finishes.
     try:
-        state = graph.invoke(state)
+        async for update in graph.astream(state, stream_mode="updates"):
+            for node_name, node_update in update.items():
+                print_status(node_name, "✓ completed")
+                if isinstance(node_update, dict):
+                    state.update(node_update)
+                    if node_name == "interpreter" and state.get("interpreted_intent"):
+                        intent = state["interpreted_intent"]
+                        print_status(
+                            node_name,
+                            f"  intent: {intent.task_type} "
+                            f"(confidence {intent.confidence:.0%})",
+                        )
     except Exception as e:
         print_status("Invoke", f"✗ Execution error: {e}", Fore.RED)
         logger.exception("Graph invocation error")
@@ -204,17 +258,38 @@ def run_analysis(question: str, user_id: str = "user", stream: bool = False, sel
     # Print results
     print(format_results(state))
 
+    # Only clean runs are worth replaying
+    if state is not None and not state.get("error_state"):
+        cache.put(question, state, user_id, selected_datasets)
+
     return state
 
 
-def interactive_mode():
+def run_analysis(question: str, user_id: str = "user", stream: bool = False, selected_datasets=None):
+    """Synchronous wrapper around arun_analysis for CLI/script callers."""
+    return asyncio.run(
+        arun_analysis(
+            question, user_id, stream=stream, selected_datasets=selected_datasets
+        )
+    )
+
+
+async def interactive_mode():
     """Run interactive CLI mode."""
+    # Compile the graph (and construct the LLM client) in a worker thread
+    # while the user types their first question; awaited before the first
+    # analysis so the prompt appears immediately.
+    warm = asyncio.create_task(asyncio.to_thread(warmup))
     print_banner()
     print(f"{Fore.CYAN}Type your analytics question (or 'quit' to exit):{Style.RESET_ALL}\n")
 
     while True:
         try:
-            question = input(f"{Fore.YELLOW}Question > {Style.RESET_ALL}").strip()
+            # input() blocks; keep it off the event loop so warmup (and
+            # any background tasks) keep running during user think time
+            question = (
+                await asyncio.to_thread(input, f"{Fore.YELLOW}Question > {Style.RESET_ALL}")
+            ).strip()
 
             if question.lower() in ["quit", "exit", "q"]:
                 print(f"{Fore.GREEN}Goodbye!{Style.RESET_ALL}")
@@ -224,18 +299,33 @@ def interactive_mode():
                 print(f"{Fore.YELLOW}Please enter a question.{Style.RESET_ALL}\n")
                 continue
 
+            if warm is not None:
+                await warm
+                warm = None
+
             # Run analysis
-            state = run_analysis(question)
+            state = await arun_analysis(question)
 
             # Option to export
-            export = input(
-                f"\n{Fore.YELLOW}Export results? (y/n): {Style.RESET_ALL}"
+            export = (
+                await asyncio.to_thread(
+                    input, f"\n{Fore.YELLOW}Export results? (y/n): {Style.RESET_ALL}"
+                )
             ).strip().lower()
             if export == "y" and state is not None:
-                filename = f"analysis_{hash(question) % 10000}.json"
-                with open(filename, "w") as f:
-                    json.dump(state_to_dict(state), f, indent=2)
-                print(f"{Fore.GREEN}✓ Exported to {filename}{Style.RESET_ALL}")
+                # Content-addressed name: deterministic across processes
+                # (unlike built-in hash()) and collision-free in practice,
+                # so re-exporting the same question is a no-op.
+                digest = hashlib.sha256(question.encode()).hexdigest()[:16]
+                filename = f"analysis_{digest}.json"
+                if Path(filename).exists():
+                    print(f"{Fore.GREEN}✓ Already exported to {filename}{Style.RESET_ALL}")
+                else:
+                    # Serialize here, write in a worker thread so disk I/O
+                    # overlaps with the next prompt
+                    payload = state_to_json_bytes(state)
+                    await asyncio.to_thread(Path(filename).write_bytes, payload)
+                    print(f"{Fore.GREEN}✓ Exported to {filename}{Style.RESET_ALL}")
 
             print("")
 
@@ -252,7 +342,7 @@ def main():
     """Main entry point."""
     if len(sys.argv) < 2:
         # Interactive mode
-        interactive_mode()
+        asyncio.run(interactive_mode())
     else:
         # CLI mode: python main.py "Your question here"
         question = " ".join(sys.argv[1:])
@@ -1,15 +1,21 @@
-from typing import TypedDict, Optional, List, Any
-from pydantic import BaseModel, Field
 import json
-from typing import List, Optional, Any
-from pydantic import BaseModel, Field
+import time
+import weakref
+from typing import TypedDict, Optional, Dict, List, Tuple, Any
+from pydantic import BaseModel, ConfigDict, Field
 
 # ============================================================================
 # Pydantic Models (for validation & serialization)
 # ============================================================================
 
+# Agents construct these models once and only read them afterwards.
+# Freezing skips assignment validation, catches accidental mutation, and
+# lets serialized forms be safely shared (see model_dump_cached).
+_FROZEN = ConfigDict(frozen=True, extra="ignore")
+
 class Intent(BaseModel):
     """Interpreted user intent from question."""
+    model_config = _FROZEN
     task_type: str = Field(..., description="Type: trend_analysis, root_cause, comparison, forecast, anomaly_detection, custom")
     entities: List[str] = Field(default_factory=list)
     metrics: List[str] = Field(default_factory=list)
@@ -20,6 +26,7 @@ class Intent(BaseModel):
 
 class DataSource(BaseModel):
     """Available data source definition."""
+    model_config = _FROZEN
     name: str
     table_name: str
     columns: List[str]
@@ -30,12 +37,14 @@ class DataSource(BaseModel):
 
 class DataSources(BaseModel):
     """Available data sources for analysis."""
+    model_config = _FROZEN
     sources: List[DataSource] = Field(default_factory=list)
     total_sources: int = 0
     coverage_score: float = Field(default=0.0, ge=0, le=1)
     warnings: List[str] = Field(default_factory=list)
 
 class AnalysisStep(BaseModel):
+    model_config = _FROZEN
     step_number: int
     description: str
     required_tables: List[str]
@@ -46,6 +55,7 @@ class AnalysisStep(BaseModel):
 
 class AnalysisPlan(BaseModel):
     """Complete multi-step analysis plan."""
+    model_config = _FROZEN
     steps: List[AnalysisStep] = Field(default_factory=list)
     total_steps: int = 0
     estimated_runtime_seconds: float = 0
@@ -55,6 +65,7 @@ class AnalysisPlan(BaseModel):
 
 class QueryExecution(BaseModel):
     """Record of executed query."""
+    model_config = _FROZEN
     query_id: str
     sql: str
     status: str  # pending, approved, executing, completed, failed
@@ -64,6 +75,7 @@ class QueryExecution(BaseModel):
 
 class QueryResults(BaseModel):
     """Results from executed queries."""
+    model_config = _FROZEN
     queries_executed: List[QueryExecution] = Field(default_factory=list)
     result_data: List[dict] = Field(default_factory=list)
     row_count: int = 0
@@ -72,6 +84,7 @@ class QueryResults(BaseModel):
 
 class Insight(BaseModel):
     """Single insight extracted from results."""
+    model_config = _FROZEN
     finding: str
     metric: str
     magnitude: str  # e.g., "+15%", "-2.3%", "3.5x"
@@ -81,6 +94,7 @@ class Insight(BaseModel):
 
 class Anomaly(BaseModel):
     """Detected anomaly in data."""
+    model_config = _FROZEN
     description: str
     severity: str = Field(default="medium")  # high, medium, low
     affected_metric: str
@@ -90,6 +104,7 @@ class Anomaly(BaseModel):
 
 class Visualization(BaseModel):
     """Chart or visualization definition."""
+    model_config = _FROZEN
     chart_id: str
     chart_type: str  # line, bar, scatter, histogram, heatmap, treemap, etc.
     title: str
@@ -99,6 +114,7 @@ class Visualization(BaseModel):
 
 class ConfidenceMetrics(BaseModel):
     """Confidence assessment of analysis results."""
+    model_config = _FROZEN
     overall_confidence: float = Field(default=0.75, ge=0, le=1)
     data_freshness: str = Field(default="recent")  # recent, moderate, stale
     sample_size_adequate: bool = True
@@ -110,6 +126,8 @@ class ConfidenceMetrics(BaseModel):
 
 
 class QueryExecutionRecord(BaseModel):
+    # Deliberately not frozen: the executor fills executed/success/
+    # rows_returned/error_message in place as each SQL step runs.
     step_number: int
     description: str
     sql: str
@@ -121,6 +139,7 @@ class QueryExecutionRecord(BaseModel):
 
 class ExecutionResults(BaseModel):
     """Results of executing the analysis plan."""
+    model_config = ConfigDict(frozen=True, extra="ignore", arbitrary_types_allowed=True)
     queries_executed: List[QueryExecutionRecord]
     row_count: int = 0
     execution_time_total_ms: int = 0
@@ -175,7 +194,12 @@ class AnalyticsState(TypedDict):
     
     # Tracking & metadata
     conversation_history: List[Any]
-    execution_log: List[str]
+    # Structured entries (status, message, monotonic timestamp); formatted
+    # lazily at render time via format_log_entry
+    execution_log: List[Tuple[str, str, float]]
+    # Entry positions per status, maintained by append_log, so renderers
+    # can pull one tag (e.g. capabilities) without scanning the whole log
+    log_index: Dict[str, List[int]]
     status: str  # created, interpreting, validating, planning, awaiting_approval, executing, analyzing, visualizing, completed, failed
     error_state: Optional[str]
 
@@ -203,18 +227,59 @@ def create_initial_state(question: str, user_id: str = "anonymous", selected_dat
         "confidence_assessment": None,
         "conversation_history": [],
         "execution_log": [],
+        "log_index": {},
         "status": "created",
         "error_state": None,
     }
 
+try:
+    import orjson
+
+    def state_to_json_bytes(state: "AnalyticsState") -> bytes:
+        """Serialize a state to indented JSON bytes (C-accelerated)."""
+        return orjson.dumps(
+            state_to_dict(state),
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+        )
+except ImportError:
+    def state_to_json_bytes(state: "AnalyticsState") -> bytes:
+        """Serialize a state to indented JSON bytes."""
+        return json.dumps(state_to_dict(state), indent=2, default=str).encode()
+
+
+# Memoized model_dump() results keyed by model identity. Models in a
+# state are never mutated after their node produces them, so the dump can
+# be reused across repeated serializations (exports, Streamlit reruns).
+# A weakref finalizer evicts each entry when its model is collected.
+_DUMP_MEMO: Dict[int, dict] = {}
+
+
+def model_dump_cached(model: BaseModel) -> dict:
+    """model_dump() with a per-instance memo for repeat serialization."""
+    key = id(model)
+    cached = _DUMP_MEMO.get(key)
+    if cached is not None:
+        return cached
+    dumped = model.model_dump()
+    try:
+        weakref.finalize(model, _DUMP_MEMO.pop, key, None)
+    except TypeError:
+        # Model type does not support weakrefs; skip memoization rather
+        # than leak entries for ids that may be reused.
+        return dumped
+    _DUMP_MEMO[key] = dumped
+    return dumped
+
+
 def state_to_dict(state: AnalyticsState) -> dict:
     """Convert state to JSON-serializable dict."""
     result = {}
     for key, value in state.items():
         if isinstance(value, BaseModel):
-            result[key] = value.model_dump()
+            result[key] = model_dump_cached(value)
         elif isinstance(value, list) and value and isinstance(value[0], BaseModel):
-            result[key] = [item.model_dump() if isinstance(item, BaseModel) else item for item in value]
+            result[key] = [model_dump_cached(item) if isinstance(item, BaseModel) else item for item in value]
         else:
             try:
                 result[key] = value
@@ -222,8 +287,24 @@ def state_to_dict(state: AnalyticsState) -> dict:
                 result[key] = str(value)
     return result
 
+def append_log(state: AnalyticsState, status: str, message: str) -> None:
+    """Append a structured log entry; formatting is deferred to render time."""
+    log = state["execution_log"]
+    # setdefault keeps states created before log_index existed working
+    state.setdefault("log_index", {}).setdefault(status, []).append(len(log))
+    log.append((status, message, time.monotonic()))
+
+
+def format_log_entry(entry) -> str:
+    """Render one execution_log entry (tolerates legacy plain strings)."""
+    if isinstance(entry, str):
+        return entry
+    status, message = entry[0], entry[1]
+    return f"[{status}] {message}"
+
+
 def log_state_transition(state: AnalyticsState, new_status: str, message: str) -> AnalyticsState:
     """Log state transition for debugging."""
-    state["execution_log"].append(f"[{new_status}] {message}")
+    append_log(state, new_status, message)
     state["status"] = new_status
     return state
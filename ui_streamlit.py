@@ -1,20 +1,109 @@
+import hashlib
+import json
+import shutil
+
 import streamlit as st
-from state import state_to_dict
+from state import format_log_entry, model_dump_cached
 from main import run_analysis
 from data_manager import list_datasets, register_dataset, DATASETS_DIR
 import pandas as pd
 try:
-    import plotly.express as px
-    HAS_PLOTLY = True
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
 except ImportError:
-    HAS_PLOTLY = False
+    HAS_PYARROW = False
+
+
+def _display_table(records):
+    """Wrap row dicts for st.dataframe without a pandas roundtrip.
+
+    st.dataframe serializes to Arrow internally anyway; handing it an
+    Arrow table directly skips pandas' dtype inference and index build.
+    """
+    if HAS_PYARROW:
+        try:
+            return pa.Table.from_pylist(records)
+        except Exception:
+            pass  # ragged/mixed rows: let pandas coerce them
+    return pd.DataFrame(records)
+
+
+def _rows_key(rows):
+    """Identity key for a table payload (first 100 rows).
+
+    Lets the results pane detect that a query step returned the same
+    rows as a dataset sample/summary and render the table only once.
+    None when cell values are unhashable; such tables always render.
+    """
+    try:
+        return hash(tuple(tuple(r.items()) for r in rows[:100]))
+    except TypeError:
+        return None
+
+
+def _df(rows, columns=None):
+    """Build a DataFrame from row dicts via from_records.
+
+    from_records avoids the general-purpose constructor's per-column
+    dtype re-inference; pass columns when the shape is known to skip
+    field discovery as well.
+    """
+    if not rows:
+        return pd.DataFrame(columns=columns or [])
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
 from pathlib import Path
 from agents.data_advisor import AVAILABLE_DATA_SOURCES  # static ones (optional)
-from data_manager import list_datasets, register_dataset, DATASETS_DIR
 
 
 st.set_page_config(page_title="Analytics Assistant", page_icon="📊", layout="wide")
 
+
+@st.cache_resource
+def _warm_engine() -> bool:
+    """Compile the graph and build the LLM clients once per server process.
+
+    get_graph/get_llm are module-level singletons, so the HTTP connection
+    pools already survive reruns; cache_resource just moves their one-time
+    construction to app load instead of the first question.
+    """
+    from graph import warmup
+
+    warmup()
+    return True
+
+
+_warm_engine()
+
+
+@st.cache_resource
+def _px():
+    """Import plotly.express on first chart render; None when absent.
+
+    Keeps Plotly's import cost (a few hundred ms) off the first paint of
+    pages that have not run an analysis yet.
+    """
+    try:
+        import plotly.express as px
+        import plotly.io as pio
+
+        # Fixed template set once per process; combined with theme=None
+        # on st.plotly_chart, Streamlit skips its post-hoc theme merge
+        # and the figure JSON ships without per-chart theming overhead.
+        pio.templates.default = "plotly_white"
+        return px
+    except ImportError:
+        return None
+
+
+@st.cache_data(ttl=60)
+def _cached_list_datasets():
+    """Catalog listing shared across the reruns every widget change triggers."""
+    return list_datasets()
+
+
 st.title("📊 Autonomous Analytics Recommendation Engine")
 
 st.sidebar.header("Datasets")
@@ -27,9 +116,7 @@ if AVAILABLE_DATA_SOURCES:
         st.sidebar.markdown(f"- `{name}` → `{meta['table']}`")
 
 # 2) Show user datasets
-st.sidebar.header("Datasets")
-
-datasets = list_datasets()
+datasets = _cached_list_datasets()
 if not datasets:
     st.sidebar.caption("No datasets yet. Upload a CSV below.")
 else:
@@ -46,37 +133,71 @@ uploaded = st.sidebar.file_uploader(
     help="CSV only for now. It will be saved under data/datasets/.",
 )
 
-if uploaded is not None:
-    # Save file
-    DATASETS_DIR.mkdir(parents=True, exist_ok=True)
-    target_path = DATASETS_DIR / uploaded.name
-    with open(target_path, "wb") as f:
-        f.write(uploaded.getbuffer())
-
-    # Infer basic schema
-    df = pd.read_csv(target_path, nrows=500)  # sample for speed
+@st.cache_data
+def _infer_schema(upload_key: str, path_str: str) -> dict:
+    """Infer the registration schema for an uploaded CSV, memoized per upload.
+
+    Keyed on the upload identity so the reruns triggered by editing the
+    logical-name textbox hit the cache instead of re-parsing the file.
+    """
+    # Read a small prefix. Arrow's streaming CSV reader parses only the
+    # first block in native code; converting that small batch to pandas
+    # keeps the column stats below unchanged.
+    df = None
+    if HAS_PYARROW:
+        reader = pacsv.open_csv(
+            path_str, read_options=pacsv.ReadOptions(block_size=1 << 16)
+        )
+        try:
+            # ArrowDtype-backed frame: nunique/dropna/unique below stay in
+            # Arrow kernels instead of converting to object arrays
+            df = reader.read_next_batch().to_pandas(types_mapper=pd.ArrowDtype)
+        except StopIteration:
+            # Header-only file: the streaming reader signals end-of-stream
+            # before the first batch. Fall through to pandas, which
+            # yields an empty frame with the header columns.
+            pass
+        finally:
+            reader.close()
+    if df is None:
+        # sample for speed
+        df = pd.read_csv(path_str, nrows=500, engine="c", low_memory=False)
     columns = list(df.columns)
-    numeric_cols = df.select_dtypes(include="number").columns.tolist()
-    categorical_cols = [c for c in columns if c not in numeric_cols]
+    dtypes = df.dtypes
+    numeric_cols = [c for c in columns if dtypes[c].kind in "iufc"]
+    categorical_cols = [c for c in columns if dtypes[c].kind not in "iufc"]
 
-    # Build per-column metadata
+    # Per-column metadata from a few vectorized passes instead of five
+    # pandas dispatches per column
     column_meta = {}
-    for c in columns:
-        info = {"dtype": str(df[c].dtype)}
-        if c in numeric_cols:
-            info["role"] = "metric"
-            info["min"] = float(df[c].min()) if df[c].notna().any() else None
-            info["max"] = float(df[c].max()) if df[c].notna().any() else None
-        else:
-            info["role"] = "dimension"
-            info["n_unique"] = int(df[c].nunique())
-            info["sample_values"] = df[c].dropna().unique()[:5].tolist()
-        column_meta[c] = info
+    if numeric_cols:
+        num_stats = df[numeric_cols].agg(["min", "max", "count"])
+        for c in numeric_cols:
+            has_values = num_stats.at["count", c] > 0
+            column_meta[c] = {
+                "dtype": str(dtypes[c]),
+                "role": "metric",
+                "min": float(num_stats.at["min", c]) if has_values else None,
+                "max": float(num_stats.at["max", c]) if has_values else None,
+            }
+    if categorical_cols:
+        cat_nunique = df[categorical_cols].nunique(dropna=True)
+        for c in categorical_cols:
+            column_meta[c] = {
+                "dtype": str(dtypes[c]),
+                "role": "dimension",
+                "n_unique": int(cat_nunique[c]),
+                # pd.unique on the raw ndarray skips Series.unique's
+                # dispatch and keeps first-seen order without a sort
+                "sample_values": pd.unique(df[c].dropna().to_numpy())[:5].tolist(),
+            }
+    # Preserve the file's column order in the stored metadata
+    column_meta = {c: column_meta[c] for c in columns}
 
     # Auto-generate a human-readable description from the columns
     description = f"Dataset with {len(columns)} columns ({len(numeric_cols)} numeric, {len(categorical_cols)} categorical). Columns: {', '.join(columns[:15])}"
 
-    schema = {
+    return {
         "columns": columns,
         "rows": int(df.shape[0]),
         "primary_keys": [],  # user can edit later if needed
@@ -85,12 +206,155 @@ if uploaded is not None:
         "description": description,
     }
 
-    logical_name = st.sidebar.text_input(
-        "Logical name for this dataset", value=uploaded.name.rsplit(".", 1)[0]
-    )
 
-    if st.sidebar.button("Register dataset"):
+@st.cache_data(show_spinner="Scanning full file for statistics...")
+def _infer_schema_full(upload_key: str, path_str: str) -> dict:
+    """Full-file schema stats via pandas' chunked reader, bounded memory.
+
+    Accumulates numeric min/max/count per 100k-row chunk and exact unique
+    sets (capped) for the remaining columns, so even multi-GB files are
+    never materialized whole.
+    """
+    _UNIQUE_CAP = 100_000  # stop collecting uniques past this many values
+
+    columns = numeric_cols = categorical_cols = dtypes = None
+    mins, maxs, counts = [], [], []
+    cat_uniques = {}
+    cat_samples = {}
+    rows = 0
+
+    # Arrow-backed columns when available: the per-chunk dropna/unique on
+    # string columns run as Arrow kernels instead of per-cell object code
+    backend = {"dtype_backend": "pyarrow"} if HAS_PYARROW else {}
+
+    for chunk in pd.read_csv(path_str, chunksize=100_000, engine="c", **backend):
+        if columns is None:
+            columns = list(chunk.columns)
+            dtypes = chunk.dtypes
+            numeric_cols = [c for c in columns if dtypes[c].kind in "iufc"]
+            categorical_cols = [c for c in columns if dtypes[c].kind not in "iufc"]
+        rows += len(chunk)
+        if numeric_cols:
+            stats = chunk[numeric_cols].agg(["min", "max", "count"])
+            mins.append(stats.loc["min"])
+            maxs.append(stats.loc["max"])
+            counts.append(stats.loc["count"])
+        for c in categorical_cols:
+            seen = cat_uniques.setdefault(c, set())
+            if len(seen) < _UNIQUE_CAP:
+                seen.update(chunk[c].dropna().unique())
+            if c not in cat_samples and seen:
+                cat_samples[c] = [v for _, v in zip(range(5), seen)]
+
+    column_meta = {}
+    if numeric_cols:
+        col_min = pd.concat(mins, axis=1).min(axis=1)
+        col_max = pd.concat(maxs, axis=1).max(axis=1)
+        col_count = pd.concat(counts, axis=1).sum(axis=1)
+        for c in numeric_cols:
+            has_values = col_count[c] > 0
+            column_meta[c] = {
+                "dtype": str(dtypes[c]),
+                "role": "metric",
+                "min": float(col_min[c]) if has_values else None,
+                "max": float(col_max[c]) if has_values else None,
+            }
+    for c in categorical_cols or []:
+        column_meta[c] = {
+            "dtype": str(dtypes[c]),
+            "role": "dimension",
+            "n_unique": len(cat_uniques.get(c, ())),
+            "sample_values": [str(v) for v in cat_samples.get(c, [])],
+        }
+    column_meta = {c: column_meta[c] for c in columns or []}
+
+    n_num = len(numeric_cols or [])
+    n_cat = len(categorical_cols or [])
+    description = f"Dataset with {len(column_meta)} columns ({n_num} numeric, {n_cat} categorical). Columns: {', '.join(list(column_meta)[:15])}"
+
+    return {
+        "columns": list(column_meta),
+        "rows": rows,
+        "primary_keys": [],  # user can edit later if needed
+        "quality_score": 0.9,
+        "column_metadata": column_meta,
+        "description": description,
+    }
+
+
+@st.cache_data
+def _file_digest(upload_key: str, path_str: str) -> str:
+    """Streaming SHA-256 of the saved upload, memoized per upload."""
+    h = hashlib.sha256()
+    with open(path_str, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _schema_for_upload(upload_key: str, path_str: str) -> dict:
+    """Schema for an uploaded file, backed by an on-disk cache.
+
+    Keyed by a content hash under DATASETS_DIR/.schema_cache, so
+    re-uploading an identical file — even in a new server process —
+    reuses the stored schema and skips inference entirely.
+    """
+    digest = _file_digest(upload_key, path_str)
+    cache_path = DATASETS_DIR / ".schema_cache" / f"{digest}.json"
+    if cache_path.exists():
+        try:
+            return json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            pass  # unreadable/corrupt entry: fall through and rebuild
+    schema = _infer_schema(upload_key, path_str)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(schema))
+    except OSError:
+        pass  # cache write is best-effort
+    return schema
+
+
+if uploaded is not None:
+    DATASETS_DIR.mkdir(parents=True, exist_ok=True)
+    target_path = DATASETS_DIR / uploaded.name
+    upload_key = getattr(uploaded, "file_id", None) or f"{uploaded.name}:{uploaded.size}"
+
+    # Save the file once per upload, not on every rerun
+    if st.session_state.get("_saved_upload") != upload_key:
+        uploaded.seek(0)  # rewind in case an earlier rerun read the buffer
+        with open(target_path, "wb") as f:
+            # Stream the upload in 1 MB chunks rather than materializing
+            # one giant buffer for large files
+            shutil.copyfileobj(uploaded, f, length=1 << 20)
+        st.session_state["_saved_upload"] = upload_key
+
+    # Immediate feedback: a header-only parse is near-free even on very
+    # wide files, so the column count shows before sampling finishes
+    header_cols = pd.read_csv(target_path, nrows=0, engine="c").columns
+    st.sidebar.caption(f"Detected {len(header_cols)} columns in {uploaded.name}")
+
+    # Form batches the name/checkbox edits into one rerun on submit;
+    # without it every keystroke in the name box reran the whole script
+    # (and re-hit the schema cache)
+    with st.sidebar.form("register_form"):
+        full_stats = st.checkbox(
+            "Full-file statistics (slower)",
+            value=False,
+            help="Scan the entire file in chunks instead of a 500-row sample.",
+        )
+        logical_name = st.text_input(
+            "Logical name for this dataset", value=uploaded.name.rsplit(".", 1)[0]
+        )
+        submitted = st.form_submit_button("Register dataset")
+
+    if submitted:
+        if full_stats:
+            schema = _infer_schema_full(upload_key, str(target_path))
+        else:
+            schema = _schema_for_upload(upload_key, str(target_path))
         register_dataset(logical_name, uploaded.name, schema)
+        _cached_list_datasets.clear()  # new dataset must show up immediately
         st.sidebar.success(f"Registered dataset '{logical_name}'")
         st.rerun()
 
@@ -106,7 +370,7 @@ question = st.text_area(
 )
 
 # Dataset selector
-dataset_names = [ds["name"] for ds in list_datasets()]
+dataset_names = [ds["name"] for ds in datasets]
 selected_datasets = st.multiselect(
     "Select dataset(s) to analyze:",
     options=dataset_names,
@@ -115,205 +379,276 @@ selected_datasets = st.multiselect(
 )
 
 run_button = st.button("Run Analysis")
+force_refresh = st.checkbox(
+    "Force refresh",
+    value=False,
+    help="Bypass the cached result for repeated questions and re-run the pipeline.",
+)
+
+
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_run(question: str, user_id: str, datasets_key: tuple):
+    """Memoize full pipeline runs per (question, user, dataset selection).
+
+    Repeat clicks with identical inputs replay the cached state instead
+    of paying the multi-agent pipeline again.
+    """
+    return run_analysis(
+        question,
+        user_id=user_id,
+        selected_datasets=list(datasets_key) or None,
+    )
+
 
 if run_button and question.strip():
+    run_question = question.strip()
+    if force_refresh:
+        _cached_run.clear()
+        # The documented prefix also bypasses run_analysis's in-process
+        # semantic cache; clearing st.cache_data alone would still replay
+        # the stale state from there.
+        run_question = "!skip-cache " + run_question
     with st.spinner("Running multi-agent analysis..."):
-        state = run_analysis(
-            question.strip(),
-            user_id=user_id,
-            selected_datasets=selected_datasets if selected_datasets else None,
+        state = _cached_run(
+            run_question,
+            user_id,
+            tuple(sorted(selected_datasets or ())),
         )
 
     if not state:
         st.error("Analysis failed. Check server logs.")
     else:
-        s = state  # shorthand
-
-        # Direct answer — show first and prominently
-        if s.get("direct_answer"):
-            st.subheader("💬 Answer")
-            st.markdown(s["direct_answer"])
-            st.divider()
-
-        # Query results tables (from DuckDB SQL execution)
-        if s.get("execution_results") and s["execution_results"].result_data:
-            qr = s["execution_results"].result_data.get("query_results")
-            if qr:
-                st.subheader("🔍 Query Results")
-                for step_key, step_result in qr.items():
-                    with st.expander(step_key, expanded=True):
-                        if step_result.get("data"):
-                            st.dataframe(pd.DataFrame(step_result["data"]))
-                        else:
-                            st.caption("No rows returned.")
-                        st.code(step_result.get("sql", ""), language="sql")
-
-        # Show interpreted intent
-        if s.get("interpreted_intent"):
-            intent = s["interpreted_intent"]
-            st.subheader("🔎 Interpreted Intent")
-            st.write(
-                {
-                    "task_type": intent.task_type,
-                    "metrics": intent.metrics,
-                    "entities": intent.entities,
-                    "time_window": intent.time_window,
-                    "segments": intent.segments,
-                    "confidence": intent.confidence,
-                }
-            )
+        st.session_state["last_state"] = state
+
+
+@st.fragment
+def _render_results():
+    """Results panel, isolated from sidebar-driven reruns.
+
+    As a fragment, only this block re-executes for its own widget
+    events; editing sidebar widgets no longer rebuilds every frame and
+    Plotly figure below. Reads the last completed analysis from
+    session_state, so results also survive unrelated reruns.
+    """
+    s = st.session_state.get("last_state")
+    if not s:
+        return
+
+    # Hoisted once: every results section below reads these locals
+    # instead of re-doing the state lookup and attribute access
+    res = s.get("execution_results")
+    result_data = res.result_data if res else None
+
+    # Query steps often return the same rows the dataset sections show
+    # again as sample/summary tables; track what has been shipped to the
+    # browser and render each distinct payload once
+    rendered_tables = set()
+
+    def _table_once(rows):
+        key = _rows_key(rows)
+        if key is not None:
+            if key in rendered_tables:
+                st.caption("Same rows as a table above — not repeated.")
+                return
+            rendered_tables.add(key)
+        st.dataframe(_display_table(rows))
+
+    # Direct answer — show first and prominently
+    if s.get("direct_answer"):
+        st.subheader("💬 Answer")
+        st.markdown(s["direct_answer"])
+        st.divider()
+
+    # Query results tables (from DuckDB SQL execution)
+    if result_data:
+        qr = result_data.get("query_results")
+        if qr:
+            st.subheader("🔍 Query Results")
+            for step_key, step_result in qr.items():
+                with st.expander(step_key, expanded=True):
+                    if step_result.get("data"):
+                        _table_once(step_result["data"])
+                    else:
+                        st.caption("No rows returned.")
+                    st.code(step_result.get("sql", ""), language="sql")
+
+    # Show interpreted intent
+    if s.get("interpreted_intent"):
+        intent = s["interpreted_intent"]
+        st.subheader("🔎 Interpreted Intent")
+        st.write(
+            {
+                "task_type": intent.task_type,
+                "metrics": intent.metrics,
+                "entities": intent.entities,
+                "time_window": intent.time_window,
+                "segments": intent.segments,
+                "confidence": intent.confidence,
+            }
+        )
 
-        # Data sources
-        if s.get("available_data_sources"):
-            ds = s["available_data_sources"]
-            st.subheader("🗄️ Data Sources")
-            st.write(
-                {
-                    "total_sources": ds.total_sources,
-                    "coverage_score": ds.coverage_score,
-                    "warnings": ds.warnings,
-                }
-            )
-            with st.expander("View sources"):
-                st.write([src.model_dump() for src in ds.sources])
-
-        # Analysis plan
-        if s.get("analysis_plan"):
-            plan = s["analysis_plan"]
-            st.subheader("📋 Analysis Plan")
-            st.write(
-                {
-                    "total_steps": plan.total_steps,
-                    "estimated_runtime_seconds": plan.estimated_runtime_seconds,
-                    "warnings": plan.warnings,
-                }
-            )
-            with st.expander("View steps"):
-                st.write([step.model_dump() for step in plan.steps])
-
-        # Execution results
-        if s.get("execution_results"):
-            res = s["execution_results"]
-            if res.result_data:
-                for ds_name, ds_result in res.result_data.items():
-                    st.subheader(f"📊 Dataset: {ds_name}")
-
-                    if "summary" in ds_result:
-                        st.markdown("**Summary statistics**")
-                        st.dataframe(pd.DataFrame(ds_result["summary"]))
-
-                    if "groupby" in ds_result:
-                        gb = ds_result["groupby"]
-                        st.markdown(
-                            f"**Top {gb['dimension']} by {gb['metric']} (sum, mean, count)**"
+    # Data sources
+    if s.get("available_data_sources"):
+        ds = s["available_data_sources"]
+        st.subheader("🗄️ Data Sources")
+        st.write(
+            {
+                "total_sources": ds.total_sources,
+                "coverage_score": ds.coverage_score,
+                "warnings": ds.warnings,
+            }
+        )
+        with st.expander("View sources"):
+            st.write([model_dump_cached(src) for src in ds.sources])
+
+    # Analysis plan
+    if s.get("analysis_plan"):
+        plan = s["analysis_plan"]
+        st.subheader("📋 Analysis Plan")
+        st.write(
+            {
+                "total_steps": plan.total_steps,
+                "estimated_runtime_seconds": plan.estimated_runtime_seconds,
+                "warnings": plan.warnings,
+            }
+        )
+        with st.expander("View steps"):
+            st.write([model_dump_cached(step) for step in plan.steps])
+
+    # Execution results: tables and charts in a single pass over
+    # result_data, so each dataset's dict/attribute walk happens once and
+    # its visuals render next to its tables
+    if result_data:
+        px = _px()
+        for ds_name, ds_result in result_data.items():
+            if ds_name == "query_results":
+                continue  # rendered above
+            st.subheader(f"📊 Dataset: {ds_name}")
+
+            if "summary" in ds_result:
+                st.markdown("**Summary statistics**")
+                _table_once(ds_result["summary"])
+
+            if "groupby" in ds_result:
+                gb = ds_result["groupby"]
+                st.markdown(
+                    f"**Top {gb['dimension']} by {gb['metric']} (sum, mean, count)**"
+                )
+                _table_once(gb["data"])
+
+            if "sample" in ds_result:
+                with st.expander("Sample rows"):
+                    _table_once(ds_result["sample"])
+
+            if "groupby" in ds_result:
+                gb = ds_result["groupby"]
+                gb_df = _df(gb["data"])
+                dim, metric = gb["dimension"], gb["metric"]
+
+                agg_cols = [a for a in ("sum", "mean") if a in gb_df.columns]
+                if dim in gb_df.columns and agg_cols:
+                    # One head() shared by both aggregates, and with
+                    # Plotly one grouped figure instead of two: a
+                    # single figure build and browser payload
+                    chart_df = gb_df.head(15)
+                    if px is not None:
+                        melted = chart_df.melt(
+                            id_vars=dim,
+                            value_vars=agg_cols,
+                            var_name="aggregate",
+                            value_name="value",
                         )
-                        st.dataframe(pd.DataFrame(gb["data"]))
-
-                    if "sample" in ds_result:
-                        with st.expander("Sample rows"):
-                            st.dataframe(pd.DataFrame(ds_result["sample"]))
-
-
-        # Rendered charts from execution data
-        if s.get("execution_results") and s["execution_results"].result_data:
-            st.subheader("📈 Visualizations")
-            for ds_name, ds_result in s["execution_results"].result_data.items():
-                if "groupby" in ds_result:
-                    gb = ds_result["groupby"]
-                    gb_df = pd.DataFrame(gb["data"])
-                    dim, metric = gb["dimension"], gb["metric"]
-
-                    if dim in gb_df.columns and "sum" in gb_df.columns:
-                        chart_df = gb_df.head(15)
-                        if HAS_PLOTLY:
-                            fig = px.bar(
-                                chart_df, x=dim, y="sum",
-                                title=f"{metric} (sum) by {dim} — {ds_name}",
-                                labels={"sum": f"{metric} (sum)", dim: dim},
-                            )
-                            st.plotly_chart(fig, use_container_width=True)
-                        else:
-                            st.markdown(f"**{metric} (sum) by {dim} — {ds_name}**")
-                            st.bar_chart(chart_df.set_index(dim)["sum"])
-
-                    if dim in gb_df.columns and "mean" in gb_df.columns:
-                        chart_df = gb_df.head(15)
-                        if HAS_PLOTLY:
+                        fig = px.bar(
+                            melted, x=dim, y="value",
+                            color="aggregate", barmode="group",
+                            title=f"{metric} by {dim} — {ds_name}",
+                            labels={"value": metric, dim: dim},
+                        )
+                        st.plotly_chart(fig, use_container_width=True, theme=None)
+                    else:
+                        for agg in agg_cols:
+                            st.markdown(f"**{metric} ({agg}) by {dim} — {ds_name}**")
+                            st.bar_chart(chart_df.set_index(dim)[agg])
+
+            # Summary: mean values per column
+            if "summary" in ds_result:
+                summary_df = _df(ds_result["summary"])
+                if "mean" in summary_df.columns and "index" in summary_df.columns:
+                    # Boolean mask + positional take instead of dropna():
+                    # dropna allocates a full filtered copy before head()
+                    # trims it, while this slices only the rows charted
+                    mask = pd.notna(summary_df["mean"].to_numpy())
+                    if mask.any():
+                        numeric_summary = summary_df.iloc[mask.nonzero()[0][:12]]
+                        if px is not None:
                             fig = px.bar(
-                                chart_df, x=dim, y="mean",
-                                title=f"{metric} (mean) by {dim} — {ds_name}",
-                                labels={"mean": f"{metric} (mean)", dim: dim},
+                                numeric_summary, x="index", y="mean",
+                                title=f"Mean values by column — {ds_name}",
+                                labels={"index": "Column", "mean": "Mean"},
+                                color_discrete_sequence=["#EF553B"],
                             )
-                            st.plotly_chart(fig, use_container_width=True)
+                            st.plotly_chart(fig, use_container_width=True, theme=None)
                         else:
-                            st.markdown(f"**{metric} (mean) by {dim} — {ds_name}**")
-                            st.bar_chart(chart_df.set_index(dim)["mean"])
-
-                # Summary: mean values per column
-                if "summary" in ds_result:
-                    summary_df = pd.DataFrame(ds_result["summary"])
-                    if "mean" in summary_df.columns and "index" in summary_df.columns:
-                        numeric_summary = summary_df.dropna(subset=["mean"]).head(12)
-                        if not numeric_summary.empty:
-                            if HAS_PLOTLY:
-                                fig = px.bar(
-                                    numeric_summary, x="index", y="mean",
-                                    title=f"Mean values by column — {ds_name}",
-                                    labels={"index": "Column", "mean": "Mean"},
-                                    color_discrete_sequence=["#EF553B"],
-                                )
-                                st.plotly_chart(fig, use_container_width=True)
-                            else:
-                                st.markdown(f"**Mean values by column — {ds_name}**")
-                                st.bar_chart(numeric_summary.set_index("index")["mean"])
-
-        # Insights
-        if s.get("insights"):
-            st.subheader("💡 Insights")
-            for ins in s["insights"]:
-                st.markdown(
-                    f"- **{ins.finding}**  \n"
-                    f"  Metric: `{ins.metric}`, Magnitude: `{ins.magnitude}`, "
-                    f"Confidence: `{ins.confidence:.0%}`, Impact: `{ins.business_impact}`"
-                )
-        # If it was a generic question, show capabilities text nicely
-        intent = s.get("interpreted_intent")
-        if intent and getattr(intent, "is_generic", False):
-            st.subheader("ℹ️ Capabilities")
-            for line in s.get("execution_log", []):
-                if line.startswith("[capabilities]"):
-                    st.markdown(line.replace("[capabilities] ", "").replace("\n", "  \n"))
-
-
-        # Anomalies
-        if s.get("anomalies"):
-            st.subheader("⚠️ Anomalies")
-            for an in s["anomalies"]:
-                st.markdown(
-                    f"- [{an.severity.upper()}] {an.description} "
-                    f"(metric: `{an.affected_metric}`, magnitude: `{an.magnitude}`, "
-                    f"confidence: `{an.confidence:.0%}`)"
-                )
+                            st.markdown(f"**Mean values by column — {ds_name}**")
+                            st.bar_chart(numeric_summary.set_index("index")["mean"])
+
+    # Insights
+    if s.get("insights"):
+        st.subheader("💡 Insights")
+        # One markdown element for the whole section: each st.markdown is
+        # a separate delta in the Streamlit protocol, so joining the items
+        # cuts N round-trips to one
+        st.markdown(
+            "\n".join(
+                f"- **{ins.finding}**  \n"
+                f"  Metric: `{ins.metric}`, Magnitude: `{ins.magnitude}`, "
+                f"Confidence: `{ins.confidence:.0%}`, Impact: `{ins.business_impact}`"
+                for ins in s["insights"]
+            )
+        )
+    # If it was a generic question, show capabilities text nicely
+    intent = s.get("interpreted_intent")
+    if intent and getattr(intent, "is_generic", False):
+        st.subheader("ℹ️ Capabilities")
+        log = s.get("execution_log", [])
+        for idx in s.get("log_index", {}).get("capabilities", ()):
+            st.markdown(log[idx][1].replace("\n", "  \n"))
+
+
+    # Anomalies
+    if s.get("anomalies"):
+        st.subheader("⚠️ Anomalies")
+        st.markdown(
+            "\n".join(
+                f"- [{an.severity.upper()}] {an.description} "
+                f"(metric: `{an.affected_metric}`, magnitude: `{an.magnitude}`, "
+                f"confidence: `{an.confidence:.0%}`)"
+                for an in s["anomalies"]
+            )
+        )
 
-        # Confidence assessment
-        if s.get("confidence_assessment"):
-            conf = s["confidence_assessment"]
-            st.subheader("🎯 Confidence Assessment")
-            st.write(
-                {
-                    "overall_confidence": conf.overall_confidence,
-                    "data_freshness": conf.data_freshness,
-                    "sample_size_adequate": conf.sample_size_adequate,
-                    "completeness_score": conf.completeness_score,
-                }
+    # Confidence assessment
+    if s.get("confidence_assessment"):
+        conf = s["confidence_assessment"]
+        st.subheader("🎯 Confidence Assessment")
+        st.write(
+            {
+                "overall_confidence": conf.overall_confidence,
+                "data_freshness": conf.data_freshness,
+                "sample_size_adequate": conf.sample_size_adequate,
+                "completeness_score": conf.completeness_score,
+            }
+        )
+        if conf.caveats:
+            st.markdown(
+                "**Caveats:**\n" + "\n".join(f"- {c}" for c in conf.caveats)
             )
-            if conf.caveats:
-                st.markdown("**Caveats:**")
-                for c in conf.caveats:
-                    st.markdown(f"- {c}")
-
-        # Execution log
-        if s.get("execution_log"):
-            with st.expander("📝 Execution Log"):
-                for line in s["execution_log"]:
-                    st.code(line)
+
+    # Execution log
+    if s.get("execution_log"):
+        with st.expander("📝 Execution Log"):
+            for line in s["execution_log"]:
+                st.code(format_log_entry(line))
+
+
+_render_results()